@@ -0,0 +1,66 @@
+"""
+Hydra Config Helpers
+
+Shared Hydra config composition for the endpoint-specific ETL scripts.
+"""
+
+import copy
+import os
+import threading
+from hydra import compose, initialize
+
+# Project root (Hydra configs live under config/hydra)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Hydra keeps a process-wide GlobalHydra instance, so concurrent initialize()
+# calls (e.g., from parallel DAG tasks) must be serialized.
+_HYDRA_LOCK = threading.Lock()
+
+# Composed configs keyed by (overrides incl. endpoint, config tree mtime)
+_CONFIG_CACHE = {}
+
+
+def config_tree_mtime(config_dir):
+    """
+    Get the newest modification time of any file in the Hydra config tree.
+    
+    Args:
+        config_dir: Root directory of the Hydra configs
+        
+    Returns:
+        Newest mtime in the tree (0 if the tree is empty)
+    """
+    newest = 0
+    for root, _, files in os.walk(config_dir):
+        for name in files:
+            newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return newest
+
+
+def compose_config(endpoint, overrides=None):
+    """
+    Compose the Hydra config for an endpoint.
+    
+    Composed configs are cached per process and reused until a file in the
+    config tree changes. Interpolations such as ${oc.env:...} are left
+    unresolved in the cache, so environment variables are still read on access.
+    
+    Args:
+        endpoint: Endpoint config group to select (e.g., "tickets", "users")
+        overrides: Optional list of extra Hydra overrides
+        
+    Returns:
+        Composed Hydra config object
+    """
+    config_dir = os.path.join(project_root, "config", "hydra")
+    config_path = os.path.relpath(config_dir, os.path.dirname(__file__))
+    overrides = [f"endpoint={endpoint}"] + list(overrides or [])
+    with _HYDRA_LOCK:
+        key = (tuple(overrides), config_tree_mtime(config_dir))
+        cfg = _CONFIG_CACHE.get(key)
+        if cfg is None:
+            with initialize(config_path=config_path, version_base=None):
+                cfg = compose(config_name="config", overrides=overrides)
+            _CONFIG_CACHE[key] = cfg
+        # Hand out a copy so callers never share one mutable config object
+        return copy.deepcopy(cfg)
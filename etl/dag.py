@@ -11,17 +11,20 @@ Pipeline Structure:
 4. Extract tickets → Transform tickets (depends on ticket_fields transform) → Load tickets
 
 The DAG ensures that:
-- All extract steps can run in parallel (except tickets depends on ticket_fields)
-- Transform steps run after their respective extract steps
-- Load steps run after their respective transform steps
+- All extract steps can run in parallel
+- Transform steps run as soon as their respective extract steps complete
+- Load steps run as soon as their respective transform steps complete
 - Tickets transform waits for ticket_fields transform to complete
 """
 
+import glob
 import os
 import sys
-import subprocess
+from datetime import timedelta
 from pathlib import Path
 from prefect import flow, task
+from prefect.task_runners import ConcurrentTaskRunner
+from prefect.tasks import task_input_hash
 from typing import Optional
 
 # Add project root to path
@@ -29,211 +32,148 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-
-@task(name="skip_placeholder", log_prints=True)
-def skip_placeholder():
-    """Placeholder task that returns True when a phase is skipped."""
-    return True
-
-
-@task(name="extract_ticket_fields", log_prints=True)
-def extract_ticket_fields():
-    """Extract ticket fields from Zendesk."""
-    script_path = project_root / "etl" / "ticket_fields" / "extract.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to extract ticket_fields (exit code: {result.returncode})")
-    return True
-
-
-@task(name="extract_organizations", log_prints=True)
-def extract_organizations():
-    """Extract organizations from Zendesk."""
-    script_path = project_root / "etl" / "organizations" / "extract.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to extract organizations (exit code: {result.returncode})")
-    return True
-
-
-@task(name="extract_users", log_prints=True)
-def extract_users():
-    """Extract users from Zendesk."""
-    script_path = project_root / "etl" / "users" / "extract.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to extract users (exit code: {result.returncode})")
-    return True
-
-
-@task(name="extract_tickets", log_prints=True)
-def extract_tickets():
-    """Extract tickets from Zendesk."""
-    script_path = project_root / "etl" / "tickets" / "extract.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to extract tickets (exit code: {result.returncode})")
-    return True
-
-
-@task(name="transform_ticket_fields", log_prints=True)
-def transform_ticket_fields(_extract_result):
-    """Transform ticket fields data."""
-    script_path = project_root / "etl" / "ticket_fields" / "transform.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to transform ticket_fields (exit code: {result.returncode})")
-    return True
-
-
-@task(name="transform_organizations", log_prints=True)
-def transform_organizations(_extract_result):
-    """Transform organizations data."""
-    script_path = project_root / "etl" / "organizations" / "transform.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to transform organizations (exit code: {result.returncode})")
-    return True
-
-
-@task(name="transform_users", log_prints=True)
-def transform_users(_extract_result):
-    """Transform users data."""
-    script_path = project_root / "etl" / "users" / "transform.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to transform users (exit code: {result.returncode})")
-    return True
-
-
-@task(name="transform_tickets", log_prints=True)
-def transform_tickets(_extract_result, _ticket_fields_transform_result):
-    """Transform tickets data (depends on ticket_fields transform for field mapping)."""
-    script_path = project_root / "etl" / "tickets" / "transform.py"
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to transform tickets (exit code: {result.returncode})")
-    return True
-
-
-@task(name="load_ticket_fields", log_prints=True)
-def load_ticket_fields(_transform_result, incremental: bool = False):
-    """Load ticket fields to PostgreSQL."""
-    script_path = project_root / "etl" / "ticket_fields" / "load.py"
-    cmd = [sys.executable, str(script_path)]
-    if incremental:
-        cmd.append("--incremental")
-    result = subprocess.run(
-        cmd,
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to load ticket_fields (exit code: {result.returncode})")
-    return True
-
-
-@task(name="load_organizations", log_prints=True)
-def load_organizations(_transform_result, incremental: bool = False):
-    """Load organizations to PostgreSQL."""
-    script_path = project_root / "etl" / "organizations" / "load.py"
-    cmd = [sys.executable, str(script_path)]
-    if incremental:
-        cmd.append("--incremental")
-    result = subprocess.run(
-        cmd,
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to load organizations (exit code: {result.returncode})")
-    return True
-
-
-@task(name="load_users", log_prints=True)
-def load_users(_transform_result, incremental: bool = False):
-    """Load users to PostgreSQL."""
-    script_path = project_root / "etl" / "users" / "load.py"
-    cmd = [sys.executable, str(script_path)]
-    if incremental:
-        cmd.append("--incremental")
-    result = subprocess.run(
-        cmd,
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to load users (exit code: {result.returncode})")
+from etl.config import compose_config
+from etl.ticket_fields import extract as ticket_fields_extract
+from etl.ticket_fields import transform as ticket_fields_transform
+from etl.ticket_fields import load as ticket_fields_load
+from etl.organizations import extract as organizations_extract
+from etl.organizations import transform as organizations_transform
+from etl.organizations import load as organizations_load
+from etl.users import extract as users_extract
+from etl.users import transform as users_transform
+from etl.users import load as users_load
+from etl.tickets import extract as tickets_extract
+from etl.tickets import transform as tickets_transform
+from etl.tickets import load as tickets_load
+from etl import load_all
+
+
+ENDPOINTS = ("ticket_fields", "organizations", "users", "tickets")
+
+# Extra upstream transforms each endpoint's transform depends on
+# (tickets transform needs the ticket_fields field map)
+TRANSFORM_DEPENDS_ON = {"tickets": ["ticket_fields"]}
+
+# Steps whose results are reused for STEP_CACHE_EXPIRATION instead of being
+# recomputed every run. Only the simple (non-incremental) ticket_fields extract is
+# cached: incremental extracts must always run so new changes are fetched. Cached
+# transforms are keyed on their newest extract file, so they rerun after any new
+# extract. Loads are never cached since they must always write to the database.
+CACHED_EXTRACTS = ("ticket_fields",)
+CACHED_TRANSFORMS = ("ticket_fields", "organizations")
+STEP_CACHE_EXPIRATION = timedelta(hours=6)
+
+# Endpoint script entry points, keyed by (stage, endpoint)
+STEP_MAINS = {
+    ("extract", "ticket_fields"): ticket_fields_extract.main,
+    ("transform", "ticket_fields"): ticket_fields_transform.main,
+    ("load", "ticket_fields"): ticket_fields_load.main,
+    ("extract", "organizations"): organizations_extract.main,
+    ("transform", "organizations"): organizations_transform.main,
+    ("load", "organizations"): organizations_load.main,
+    ("extract", "users"): users_extract.main,
+    ("transform", "users"): users_transform.main,
+    ("load", "users"): users_load.main,
+    ("extract", "tickets"): tickets_extract.main,
+    ("transform", "tickets"): tickets_transform.main,
+    ("load", "tickets"): tickets_load.main,
+    ("load", "all"): load_all.main,
+}
+
+
+def step_cache_key(context, parameters):
+    """
+    Cache key function for run_step.
+    
+    Only the extract steps in CACHED_EXTRACTS and the transform steps in
+    CACHED_TRANSFORMS are cached. A transform's key also includes its newest
+    extract file (from the input_dir parameter), so a fresh extract is never skipped.
+    
+    Args:
+        context: Prefect task run context
+        parameters: run_step parameters
+        
+    Returns:
+        Cache key string, or None to disable caching for this step
+    """
+    stage, endpoint = parameters["stage"], parameters["endpoint"]
+    if stage == "extract":
+        cached = endpoint in CACHED_EXTRACTS
+    elif stage == "transform":
+        cached = endpoint in CACHED_TRANSFORMS and parameters.get("input_dir")
+    else:
+        cached = False
+    if not cached:
+        return None
+    
+    cache_key = task_input_hash(context, parameters)
+    if stage == "transform":
+        # Same file names the transforms load; skips *.jsonl.part and *.json.tmp leftovers
+        input_dir = parameters["input_dir"]
+        extract_files = glob.glob(f"{input_dir}/{endpoint}_*.json") + glob.glob(f"{input_dir}/{endpoint}_*.jsonl")
+        if extract_files:
+            latest_file = max(extract_files, key=os.path.getmtime)
+            cache_key = f"{cache_key}-{os.path.basename(latest_file)}-{int(os.path.getmtime(latest_file))}"
+    return cache_key
+
+
+def extract_output_dir(endpoint):
+    """
+    Get the directory an endpoint's extract writes to (its transform's input).
+    
+    Args:
+        endpoint: Endpoint name (e.g., "organizations")
+        
+    Returns:
+        Extract output directory path
+    """
+    cfg = compose_config(endpoint)
+    return f"{cfg.paths.data_dir}/{cfg.extract[endpoint]}"
+
+
+@task(
+    name="run_step",
+    task_run_name="{stage}_{endpoint}",
+    cache_key_fn=step_cache_key,
+    cache_expiration=STEP_CACHE_EXPIRATION,
+    log_prints=True
+)
+def run_step(stage: str, endpoint: str, incremental: bool = False, input_dir: Optional[str] = None):
+    """
+    Run one ETL step for an endpoint by calling its script's main() in-process.
+    
+    The scripts signal failure with sys.exit(1); this is converted into a regular
+    exception so Prefect marks the task as failed.
+    
+    Args:
+        stage: Pipeline stage ("extract", "transform", or "load")
+        endpoint: Endpoint name (e.g., "tickets", "users", or "all" for the combined load)
+        incremental: If True, use incremental loading mode (load stage only)
+        input_dir: Extract output directory, used only for the transform cache key
+    """
+    main_fn = STEP_MAINS[(stage, endpoint)]
+    kwargs = {"incremental": incremental} if stage == "load" else {}
+    try:
+        main_fn(**kwargs)
+    except SystemExit as e:
+        if e.code:
+            raise Exception(f"Failed to {stage} {endpoint} (exit code: {e.code})")
     return True
 
 
-@task(name="load_tickets", log_prints=True)
-def load_tickets(_transform_result, incremental: bool = False):
-    """Load tickets to PostgreSQL."""
-    script_path = project_root / "etl" / "tickets" / "load.py"
-    cmd = [sys.executable, str(script_path)]
-    if incremental:
-        cmd.append("--incremental")
-    result = subprocess.run(
-        cmd,
-        cwd=str(project_root),
-        capture_output=False,
-        text=True
-    )
-    if result.returncode != 0:
-        raise Exception(f"Failed to load tickets (exit code: {result.returncode})")
-    return True
+# Extract steps call the Zendesk API; cap how many run at once with a Prefect
+# tag-based concurrency limit (prefect concurrency-limit create zendesk-api 3)
+ZENDESK_API_TAG = "zendesk-api"
+extract_step = run_step.with_options(tags=[ZENDESK_API_TAG])
 
 
-@flow(name="zendesk_etl_pipeline", log_prints=True)
+@flow(name="zendesk_etl_pipeline", task_runner=ConcurrentTaskRunner(), log_prints=True)
 def zendesk_etl_pipeline(
     incremental: bool = False,
     run_extract: bool = True,
     run_transform: bool = True,
-    run_load: bool = True
+    run_load: bool = True,
+    combined_load: bool = False
 ):
     """
     Main ETL pipeline flow.
@@ -244,13 +184,16 @@ def zendesk_etl_pipeline(
         run_extract: If True, run extract steps. Defaults to True.
         run_transform: If True, run transform steps. Defaults to True.
         run_load: If True, run load steps. Defaults to True.
+        combined_load: If True, load all endpoints in a single task over one database
+                      connection and transaction once every transform has finished. Defaults to False
+                      (each endpoint loads as soon as its own transform completes).
     
     Pipeline execution order:
-    1. Extract all endpoints (can run in parallel) - if run_extract=True
-    2. Transform ticket_fields first (needed for tickets transform) - if run_transform=True
-    3. Transform organizations and users (can run in parallel) - if run_transform=True
-    4. Transform tickets (waits for ticket_fields transform) - if run_transform=True
-    5. Load all endpoints (can run in parallel after transforms complete) - if run_load=True
+    Each endpoint runs as its own extract → transform → load chain, and every
+    step is dispatched as soon as its own upstream step completes (there is no
+    barrier between phases). The only cross-endpoint edge is that the tickets
+    transform also waits for the ticket_fields transform (field mapping).
+    Phases disabled via run_extract/run_transform/run_load are skipped.
     """
     print("=" * 80)
     print("Starting Zendesk ETL Pipeline")
@@ -258,94 +201,54 @@ def zendesk_etl_pipeline(
     print(f"Configuration: extract={run_extract}, transform={run_transform}, load={run_load}, incremental={incremental}")
     print("=" * 80)
     
-    # Initialize task variables
-    extract_ticket_fields_task = None
-    extract_organizations_task = None
-    extract_users_task = None
-    extract_tickets_task = None
-    
-    transform_ticket_fields_task = None
-    transform_organizations_task = None
-    transform_users_task = None
-    transform_tickets_task = None
+    if not run_extract:
+        print("\nSkipping extract (run_extract=False)")
+    if not run_transform:
+        print("\nSkipping transform (run_transform=False)")
+    if not run_load:
+        print("\nSkipping load (run_load=False)")
     
-    load_ticket_fields_task = None
-    load_organizations_task = None
-    load_users_task = None
-    load_tickets_task = None
-    
-    # Step 1: Extract all endpoints (can run in parallel)
-    if run_extract:
-        print("\n[Step 1] Extracting data from Zendesk...")
-        extract_ticket_fields_task = extract_ticket_fields()
-        extract_organizations_task = extract_organizations()
-        extract_users_task = extract_users()
-        extract_tickets_task = extract_tickets()
-    else:
-        print("\n[Step 1] Skipping extract (run_extract=False)")
-        # Create placeholder tasks to satisfy dependencies
-        extract_ticket_fields_task = skip_placeholder()
-        extract_organizations_task = skip_placeholder()
-        extract_users_task = skip_placeholder()
-        extract_tickets_task = skip_placeholder()
+    extract_futures = {}
+    transform_futures = {}
+    load_futures = {}
     
-    # Step 2-4: Transform steps
-    if run_transform:
-        # Step 2: Transform ticket_fields first (needed for tickets transform)
-        print("\n[Step 2] Transforming ticket_fields...")
-        transform_ticket_fields_task = transform_ticket_fields(extract_ticket_fields_task)
+    for endpoint in ENDPOINTS:
+        print(f"\n[{endpoint}] Submitting extract → transform → load...")
         
-        # Step 3: Transform organizations and users (can run in parallel)
-        print("\n[Step 3] Transforming organizations and users...")
-        transform_organizations_task = transform_organizations(extract_organizations_task)
-        transform_users_task = transform_users(extract_users_task)
+        # Skipped phases submit nothing; downstream steps only wait on futures that exist
+        if run_extract:
+            extract_futures[endpoint] = extract_step.submit("extract", endpoint)
         
-        # Step 4: Transform tickets (waits for ticket_fields transform)
-        print("\n[Step 4] Transforming tickets...")
-        transform_tickets_task = transform_tickets(extract_tickets_task, transform_ticket_fields_task)
-    else:
-        print("\n[Step 2-4] Skipping transform (run_transform=False)")
-        # Create placeholder tasks to satisfy dependencies
-        # Note: Transform tasks depend on extract tasks, so we still need extract placeholders
-        transform_ticket_fields_task = skip_placeholder()
-        transform_organizations_task = skip_placeholder()
-        transform_users_task = skip_placeholder()
-        transform_tickets_task = skip_placeholder()
+        if run_transform:
+            upstream = [extract_futures[endpoint]] if endpoint in extract_futures else []
+            upstream += [transform_futures[dep] for dep in TRANSFORM_DEPENDS_ON.get(endpoint, []) if dep in transform_futures]
+            input_dir = extract_output_dir(endpoint) if endpoint in CACHED_TRANSFORMS else None
+            transform_futures[endpoint] = run_step.submit("transform", endpoint, input_dir=input_dir, wait_for=upstream)
+        
+        if run_load and not combined_load:
+            upstream = [transform_futures[endpoint]] if endpoint in transform_futures else []
+            load_futures[endpoint] = run_step.submit(
+                "load", endpoint, incremental=incremental, wait_for=upstream
+            )
     
-    # Step 5: Load all endpoints (can run in parallel after transforms complete)
-    if run_load:
-        print("\n[Step 5] Loading data to PostgreSQL...")
-        load_ticket_fields_task = load_ticket_fields(transform_ticket_fields_task, incremental=incremental)
-        load_organizations_task = load_organizations(transform_organizations_task, incremental=incremental)
-        load_users_task = load_users(transform_users_task, incremental=incremental)
-        load_tickets_task = load_tickets(transform_tickets_task, incremental=incremental)
-    else:
-        print("\n[Step 5] Skipping load (run_load=False)")
+    if run_load and combined_load:
+        print("\n[all] Submitting combined load...")
+        combined_load_future = run_step.submit(
+            "load", "all", incremental=incremental, wait_for=list(transform_futures.values())
+        )
+        load_futures = {endpoint: combined_load_future for endpoint in ENDPOINTS}
+    
+    # Wait for all submitted tasks; .result() re-raises any task failure
+    results = {
+        stage: {endpoint: futures[endpoint].result() if endpoint in futures else None for endpoint in ENDPOINTS}
+        for stage, futures in (("extract", extract_futures), ("transform", transform_futures), ("load", load_futures))
+    }
     
     print("\n" + "=" * 80)
     print("✅ Zendesk ETL Pipeline completed successfully!")
     print("=" * 80)
     
-    return {
-        "extract": {
-            "ticket_fields": extract_ticket_fields_task,
-            "organizations": extract_organizations_task,
-            "users": extract_users_task,
-            "tickets": extract_tickets_task,
-        },
-        "transform": {
-            "ticket_fields": transform_ticket_fields_task,
-            "organizations": transform_organizations_task,
-            "users": transform_users_task,
-            "tickets": transform_tickets_task,
-        },
-        "load": {
-            "ticket_fields": load_ticket_fields_task,
-            "organizations": load_organizations_task,
-            "users": load_users_task,
-            "tickets": load_tickets_task,
-        }
-    }
+    return results
 
 
 if __name__ == "__main__":
@@ -387,6 +290,11 @@ if __name__ == "__main__":
         action="store_true",
         help="Skip load steps"
     )
+    parser.add_argument(
+        "--combined-load",
+        action="store_true",
+        help="Load all endpoints in one task over a single database connection and transaction"
+    )
     args = parser.parse_args()
     
     # Determine which phases to run
@@ -413,6 +321,7 @@ if __name__ == "__main__":
         incremental=args.incremental,
         run_extract=run_extract,
         run_transform=run_transform,
-        run_load=run_load
+        run_load=run_load,
+        combined_load=args.combined_load
     )
 
@@ -5,55 +5,134 @@ This module provides reusable extraction functions for all Zendesk endpoints.
 Endpoint-specific extract.py files import and use these functions.
 """
 
+import hashlib
 import requests
-import json
+import orjson
 import time
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
+from urllib.parse import urlencode
 
+from etl.zendesk_client import SESSION, REQUEST_TIMEOUT, get_with_retry, configure_rate_limit
 from utils.extract_utils import (
     load_last_sync_time,
     save_sync_time,
-    get_total_ticket_count
+    load_last_sync_cursor,
+    save_sync_cursor,
+    get_total_ticket_count,
+    pace_from_rate_limit_headers,
+    load_etag,
+    save_etag,
+    load_extract_progress,
+    save_extract_progress,
+    truncate_partial_extract,
+    clear_extract_progress
 )
 
 
-def extract_simple_endpoint(subdomain, resource, auth, output_dir):
+@dataclass(frozen=True, slots=True)
+class EndpointConfig:
+    """
+    Endpoint-specific extraction settings, built once from the Hydra config.
+    
+    Attributes:
+        endpoint: Endpoint name used for config paths (e.g., 'tickets')
+        resource_key: Resource key in API responses (e.g., 'tickets')
+        use_incremental: Whether to use the Incremental Export API
+        output_subdir: Output subdirectory name
+        timestamp_file: Sync timestamp file name, or None
+        include_param: Include (side-load) parameter, or None
+        count_endpoint: Count endpoint path, or None
+        cursor_file: Cursor file name (use the cursor-based incremental export), or None
+        etag_file: ETag file name (send If-None-Match for simple endpoints), or None
+    """
+    endpoint: str
+    resource_key: str
+    use_incremental: bool
+    output_subdir: str
+    timestamp_file: Optional[str] = None
+    include_param: Optional[str] = None
+    count_endpoint: Optional[str] = None
+    cursor_file: Optional[str] = None
+    etag_file: Optional[str] = None
+    
+    @classmethod
+    def from_cfg(cls, cfg):
+        """
+        Builds the endpoint config from a composed Hydra config.
+        
+        Optional keys that are missing or null in the endpoint YAML become None.
+        """
+        return cls(
+            endpoint=cfg.endpoint,
+            resource_key=cfg.resource_key,
+            use_incremental=bool(cfg.use_incremental),
+            output_subdir=cfg.output_subdir,
+            timestamp_file=cfg.get('timestamp_file') or None,
+            include_param=cfg.get('include_param') or None,
+            count_endpoint=cfg.get('count_endpoint') or None,
+            cursor_file=cfg.get('cursor_file') or None,
+            etag_file=cfg.get('etag_file') or None
+        )
+
+
+def extract_simple_endpoint(subdomain, resource, auth, output_dir, etag_file=None):
     """
     Fetches data from a simple Zendesk API endpoint (non-incremental).
     Used for endpoints like ticket_fields.
     
+    When etag_file is given, the saved ETag is sent as If-None-Match and a
+    304 Not Modified response reuses the previously saved file instead of
+    writing a new one. A 200 response whose body hashes the same as the
+    previous one is treated the same way.
+    
     Args:
         subdomain: Zendesk subdomain
         resource: Resource name (e.g., 'ticket_fields')
         auth: Authentication tuple (email/token, api_token)
-        output_dir: Directory to save extracted data
+        output_dir: Directory to save extracted data (must already exist)
+        etag_file: Optional path of the file storing the last ETag and content hash
         
     Returns:
         List of records or None if error
     """
     url = f"https://{subdomain}.zendesk.com/api/v2/{resource}.json"
-    all_records = []
+    records = []
+    
+    # Send the saved ETag so Zendesk can skip unchanged data
+    etag, previous_file, previous_hash = load_etag(etag_file) if etag_file else (None, None, None)
+    headers = {'If-None-Match': etag} if etag else None
     
     print(f"\n--- Starting Simple Export for {resource} ---")
     print(f"-> Fetching: {url}")
     
     try:
-        response = requests.get(url, auth=auth)
+        response = get_with_retry(url, auth, headers=headers)
         
-        # Handle Rate Limits (429)
-        if response.status_code == 429:
-            retry_after = int(response.headers.get('Retry-After', 60))
-            print(f"!!! Rate limit hit. Waiting for {retry_after} seconds...")
-            time.sleep(retry_after)
-            response = requests.get(url, auth=auth)
+        # Nothing changed since the last run (304 Not Modified)
+        if response.status_code == 304:
+            print(f"-> {resource} unchanged since last extraction. Reusing {previous_file}")
+            with open(previous_file, 'rb') as f:
+                return orjson.loads(f.read())
         
         response.raise_for_status()
-        data = response.json()
+        
+        # Same response body as last time (server sent no ETag or ignored it)
+        content_hash = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if content_hash == previous_hash:
+            print(f"-> {resource} content unchanged since last extraction. Reusing {previous_file}")
+            save_etag(response.headers.get('ETag'), previous_file, etag_file, content_hash)
+            with open(previous_file, 'rb') as f:
+                return orjson.loads(f.read())
+        
+        data = orjson.loads(response.content)
         
         # Get the resource key (e.g., 'ticket_fields' from the response)
-        records = data.get(resource)
+        records = data.get(resource) or []
         
         if records:
             # Add _extracted_at timestamp to each record
@@ -61,48 +140,91 @@ def extract_simple_endpoint(subdomain, resource, auth, output_dir):
             for record in records:
                 record['_extracted_at'] = extracted_at
             
-            all_records.extend(records)
-            print(f"-> Successfully fetched {len(all_records)} {resource}.")
+            print(f"-> Successfully fetched {len(records)} {resource}.")
             
             # Save the data
             filename = f"{output_dir}/{resource}_{int(datetime.now().timestamp())}.json"
-            os.makedirs(output_dir, exist_ok=True)
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(all_records, f, ensure_ascii=False, indent=2)
+            # Write to a temporary file first so a crash never leaves a truncated extract
+            tmp_filename = f"{filename}.tmp"
+            with open(tmp_filename, 'wb') as f:
+                f.write(orjson.dumps(records))
+            os.replace(tmp_filename, filename)
             print(f"-> Data saved to {filename}")
+            
+            # Remember the ETag and content hash for the next run
+            if etag_file:
+                save_etag(response.headers.get('ETag'), filename, etag_file, content_hash)
         else:
             print(f"⚠️  No {resource} found in response.")
             
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"❌ Error fetching {resource}: {e}")
         return None
     
-    return all_records
+    return records
+
+
+def write_records_jsonl(records, output_file):
+    """
+    Appends records to an open JSON Lines file, one record per line.
+    
+    Args:
+        records: List of record dictionaries
+        output_file: File object opened for writing in binary mode
+    """
+    for record in records:
+        output_file.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+
+
+def fetch_page(url, auth, previous_response=None):
+    """
+    Fetches one export page, pacing on the previous page's rate-limit headers first.
+    
+    Args:
+        url: Page URL to fetch
+        auth: Authentication tuple (email/token, api_token)
+        previous_response: Optional response of the previous page, used for pacing
+        
+    Returns:
+        requests.Response
+    """
+    if previous_response is not None:
+        pace_from_rate_limit_headers(previous_response)  # Only slow down when the rate limit runs low
+    return get_with_retry(url, auth)  # Retries rate limits (429) with jittered backoff
 
 
-def extract_incremental_endpoint(resource, subdomain, start_time, auth, include_param=None):
+def extract_incremental_endpoint(resource, subdomain, start_time, auth, output_file, include_param=None, progress_file=None, started_at=None):
     """
     Fetches data from Zendesk Incremental Export API.
     Used for endpoints like tickets, users, organizations.
     
+    Each page is written to output_file as it arrives, so memory use stays at
+    one page regardless of how many records the export returns. When
+    progress_file is given, the page's end_time and the output file offset are
+    checkpointed after every write so an interrupted extraction can resume
+    from the next page.
+    
     Args:
         resource: Resource name (e.g., 'tickets', 'users')
         subdomain: Zendesk subdomain
         start_time: Unix timestamp to start from
         auth: Authentication tuple (email/token, api_token)
+        output_file: File object the records are streamed to as JSON Lines
         include_param: Optional include parameter (e.g., 'users' for tickets)
+        progress_file: Optional path of the mid-extraction checkpoint file
+        started_at: Unix timestamp the extraction started at (stored in the checkpoint)
         
     Returns:
-        Tuple of (list of records, final_end_time)
+        Tuple of (number of records written, final_end_time)
     """
-    # Build URL with optional include parameter
-    url_params = f"start_time={start_time}"
+    # Build the first page URL (later pages come from the API's next_page)
+    url_params = {'start_time': start_time}
     if include_param:
-        url_params += f"&include={include_param}"
+        url_params['include'] = include_param
     
-    url = f"https://{subdomain}.zendesk.com/api/v2/incremental/{resource}.json?{url_params}"
+    url = f"https://{subdomain}.zendesk.com/api/v2/incremental/{resource}.json?{urlencode(url_params)}"
     
-    all_records = []
+    record_count = 0
     final_end_time = None
     
     # Set extraction timestamp once for the entire extraction run
@@ -110,50 +232,145 @@ def extract_incremental_endpoint(resource, subdomain, start_time, auth, include_
     
     print(f"\n--- Starting Incremental Export for {resource} ---")
     print(f"-> Starting from timestamp: {start_time}")
+    print(f"-> Fetching: {url}")
     
-    while url:
-        print(f"-> Fetching: {url}")
-        response = requests.get(url, auth=auth)
-        
-        # Handle Rate Limits (429)
-        if response.status_code == 429:
-            retry_after = int(response.headers.get('Retry-After', 60))
-            print(f"!!! Rate limit hit. Waiting for {retry_after} seconds...")
-            time.sleep(retry_after)
-            continue  # Retry the same URL
-        
-        response.raise_for_status()  # Raise an exception for other bad status codes (4xx, 5xx)
-        
-        data = response.json()
+    page_count = 0
+    # Fetch pages on a background thread so the next request is already in
+    # flight while the current page is being written
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending_page = prefetcher.submit(fetch_page, url, auth)
+        while pending_page:
+            response = pending_page.result()
+            response.raise_for_status()  # Raise an exception for other bad status codes (4xx, 5xx)
+            
+            data = orjson.loads(response.content)
+            page_count += 1
+            end_of_stream = data.get('end_of_stream', False)
+            next_url = None if end_of_stream else data.get('next_page')
+            
+            # Start fetching the next page before writing this one
+            pending_page = prefetcher.submit(fetch_page, next_url, auth, response) if next_url else None
+            
+            records = data.get(resource)
+            if records:
+                # Add _extracted_at timestamp to each record (using timestamp from start of extraction)
+                for record in records:
+                    record['_extracted_at'] = extracted_at
+                
+                write_records_jsonl(records, output_file)
+                record_count += len(records)
+                # One progress line per page (the page URL is not printed)
+                print(f"   Page {page_count}: fetched {len(records)} records. Total records: {record_count:,}")
+            
+            # Check for end of stream
+            if end_of_stream:
+                print("\n -> End of stream reached. No more data available.")
+                final_end_time = data.get('end_time')
+                print(f"-> Final sync timestamp (API's reported end_time): {final_end_time}")
+                print(f"-> Total records fetched in this batch: {record_count:,}")
+                print("\n -> Extraction Complete: End of stream reached.")
+                break
+            
+            # Checkpoint progress so a restart resumes from the next page
+            if progress_file and next_url:
+                output_file.flush()
+                save_extract_progress({'end_time': data.get('end_time'), 'offset': output_file.tell(), 'started_at': started_at}, progress_file)
+    
+    return record_count, final_end_time
+
 
+def extract_incremental_cursor_endpoint(resource, subdomain, start_time, auth, output_file, cursor=None, include_param=None, progress_file=None, started_at=None):
+    """
+    Fetches data from Zendesk's cursor-based Incremental Export API.
+    Used for endpoints that support it, like tickets.
+    
+    Resumes from the saved cursor when one is given, otherwise starts at start_time.
+    Each page is written to output_file as it arrives, and when progress_file is
+    given the page's after_cursor and the output file offset are checkpointed
+    after every write.
+    
+    Args:
+        resource: Resource name (e.g., 'tickets')
+        subdomain: Zendesk subdomain
+        start_time: Unix timestamp to start from (used only when cursor is None)
+        auth: Authentication tuple (email/token, api_token)
+        output_file: File object the records are streamed to as JSON Lines
+        cursor: Optional after_cursor saved by a previous run
+        include_param: Optional include parameter (e.g., 'users' for tickets)
+        progress_file: Optional path of the mid-extraction checkpoint file
+        started_at: Unix timestamp the extraction started at (stored in the checkpoint)
         
-        records = data.get(resource)
-        if records:
-            # Add _extracted_at timestamp to each record (using timestamp from start of extraction)
-            for record in records:
-                record['_extracted_at'] = extracted_at
+    Returns:
+        Tuple of (number of records written, final after_cursor)
+    """
+    # Build URL from the saved cursor, or from start_time on the first run
+    if cursor:
+        url_params = {'cursor': cursor}
+    else:
+        url_params = {'start_time': start_time}
+    if include_param:
+        url_params['include'] = include_param
+    
+    url = f"https://{subdomain}.zendesk.com/api/v2/incremental/{resource}/cursor.json?{urlencode(url_params)}"
+    
+    record_count = 0
+    after_cursor = cursor
+    
+    # Set extraction timestamp once for the entire extraction run
+    extracted_at = datetime.now().isoformat()
+    
+    print(f"\n--- Starting Cursor-Based Incremental Export for {resource} ---")
+    if cursor:
+        print("-> Resuming from saved cursor")
+    else:
+        print(f"-> Starting from timestamp: {start_time}")
+    print(f"-> Fetching: {url}")
+    
+    page_count = 0
+    # Fetch pages on a background thread so the next request is already in
+    # flight while the current page is being written
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending_page = prefetcher.submit(fetch_page, url, auth)
+        while pending_page:
+            response = pending_page.result()
+            response.raise_for_status()  # Raise an exception for other bad status codes (4xx, 5xx)
             
-            all_records.extend(records)
-            print(f"   Fetched {len(records)} records. Total records: {len(all_records):,}")
-        
-        # Check for end of stream
-        if data.get('end_of_stream', False):
-            print(f"\n -> End of stream reached. No more data available.")
-            final_end_time = data.get('end_time')
-            print(f"-> Final sync timestamp (API's reported end_time): {final_end_time}")
-            print(f"-> Total records fetched in this batch: {len(all_records):,}")
-            print("\n -> Extraction Complete: End of stream reached.")
-            break
-        
-        next_url = data.get('next_page')
-        
-        # Proceed to the next page
-        url = next_url
-        
-        if url:
-            time.sleep(1)  # Be kind to the API
+            data = orjson.loads(response.content)
+            page_count += 1
+            end_of_stream = data.get('end_of_stream', False)
+            next_url = None if end_of_stream else data.get('after_url')
+            
+            # Start fetching the next page before writing this one
+            pending_page = prefetcher.submit(fetch_page, next_url, auth, response) if next_url else None
+            
+            records = data.get(resource)
+            if records:
+                # Add _extracted_at timestamp to each record (using timestamp from start of extraction)
+                for record in records:
+                    record['_extracted_at'] = extracted_at
+                
+                write_records_jsonl(records, output_file)
+                record_count += len(records)
+                # One progress line per page (the page URL is not printed)
+                print(f"   Page {page_count}: fetched {len(records)} records. Total records: {record_count:,}")
+            
+            # Keep the latest cursor so the next run resumes where this one stopped
+            if data.get('after_cursor'):
+                after_cursor = data.get('after_cursor')
+            
+            # Check for end of stream
+            if end_of_stream:
+                print("\n -> End of stream reached. No more data available.")
+                print(f"-> Total records fetched in this batch: {record_count:,}")
+                print("\n -> Extraction Complete: End of stream reached.")
+                break
+            
+            # Checkpoint progress so a restart resumes from the next page
+            if progress_file and next_url:
+                output_file.flush()
+                save_extract_progress({'after_cursor': after_cursor, 'offset': output_file.tell(), 'started_at': started_at}, progress_file)
     
-    return all_records, final_end_time
+    return record_count, after_cursor
 
 
 def run_extraction(cfg, endpoint_config):
@@ -162,18 +379,12 @@ def run_extraction(cfg, endpoint_config):
     
     Args:
         cfg: Hydra config object
-        endpoint_config: Dictionary with endpoint-specific configuration:
-            - use_incremental: bool
-            - resource_key: str
-            - output_subdir: str
-            - timestamp_file: str or None
-            - include_param: str or None
-            - count_endpoint: str or None
+        endpoint_config: EndpointConfig with endpoint-specific settings
             
     Returns:
         True if successful, False otherwise
     """
-    resource = endpoint_config['resource_key']
+    resource = endpoint_config.resource_key
     
     # Input validation
     if not all([cfg.zendesk.subdomain, cfg.zendesk.email, cfg.zendesk.api_token]):
@@ -182,18 +393,29 @@ def run_extraction(cfg, endpoint_config):
     
     auth = (f"{cfg.zendesk.email}/token", cfg.zendesk.api_token)
     
-    # Set up output directory
-    extract_path = cfg.extract[endpoint_config['endpoint']]
+    # Share one request budget across all extract tasks hitting this subdomain
+    if hasattr(cfg.zendesk, 'rate_limit_rpm') and cfg.zendesk.rate_limit_rpm:
+        configure_rate_limit(cfg.zendesk.subdomain, int(cfg.zendesk.rate_limit_rpm))
+    
+    # Set up output and sync-state directories (created once per extraction)
+    extract_path = cfg.extract[endpoint_config.endpoint]
     output_dir = f"{cfg.paths.data_dir}/{extract_path}"
     os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(cfg.paths.config_dir, exist_ok=True)
     
     # Handle simple endpoints (non-incremental)
-    if not endpoint_config['use_incremental']:
+    if not endpoint_config.use_incremental:
         print(f"\n{'='*60}")
         print(f"Extracting {resource} (Simple API)")
         print(f"{'='*60}")
         
-        records = extract_simple_endpoint(cfg.zendesk.subdomain, resource, auth, output_dir)
+        # Set up ETag file
+        if endpoint_config.etag_file:
+            etag_file = f"{cfg.paths.config_dir}/{endpoint_config.etag_file}"
+        else:
+            etag_file = None
+        
+        records = extract_simple_endpoint(cfg.zendesk.subdomain, resource, auth, output_dir, etag_file)
         
         if records:
             print(f"\n✅ Successfully extracted {len(records)} {resource}")
@@ -208,50 +430,100 @@ def run_extraction(cfg, endpoint_config):
     print(f"{'='*60}")
     
     # Set up timestamp file
-    if endpoint_config.get('timestamp_file'):
-        timestamp_file = f"{cfg.paths.config_dir}/{endpoint_config['timestamp_file']}"
-        os.makedirs(cfg.paths.config_dir, exist_ok=True)
+    if endpoint_config.timestamp_file:
+        timestamp_file = f"{cfg.paths.config_dir}/{endpoint_config.timestamp_file}"
     else:
         timestamp_file = None
     
-    # Get total count if available (only for tickets)
-    if endpoint_config.get('count_endpoint'):
-        count_url = f"https://{cfg.zendesk.subdomain}.zendesk.com/api/v2/{endpoint_config['count_endpoint']}"
-        get_total_ticket_count(auth, count_url)
+    # Set up cursor file (cursor-based incremental export)
+    if endpoint_config.cursor_file:
+        cursor_file = f"{cfg.paths.config_dir}/{endpoint_config.cursor_file}"
+    else:
+        cursor_file = None
     
-    # Load the timestamp from the previous run
+    # Load the timestamp (and cursor, if any) from the previous run
     last_sync_time = load_last_sync_time(timestamp_file) if timestamp_file else 0
+    last_cursor = load_last_sync_cursor(cursor_file) if cursor_file else None
     
-    if last_sync_time == 0:
+    if last_sync_time == 0 and not last_cursor:
         print("\n!!! WARNING: Starting from timestamp 0. This will pull ALL historical records!")
         print("!!! This may take a long time and consume a large portion of your daily rate limit.")
+        
+        # Get total count if available (only for tickets); only informative for a full pull
+        if endpoint_config.count_endpoint:
+            count_url = f"https://{cfg.zendesk.subdomain}.zendesk.com/api/v2/{endpoint_config.count_endpoint}"
+            get_total_ticket_count(auth, count_url, session=SESSION, timeout=REQUEST_TIMEOUT)
         time.sleep(2)
     
-    # Extract data
-    include_param = endpoint_config.get('include_param')
-    all_records, api_end_time = extract_incremental_endpoint(
-        resource,
-        cfg.zendesk.subdomain,
-        last_sync_time,
-        auth,
-        include_param
-    )
-    
-    # Save fetched records and update the sync timestamp
-    if all_records:
-        # Save all_records to a JSON file using api_end_time or current timestamp
+    # Resume an interrupted extraction from its last checkpointed page
+    include_param = endpoint_config.include_param
+    partial_filename = f"{output_dir}/{resource}_in_progress.jsonl.part"
+    progress_file = f"{cfg.paths.config_dir}/{resource}_extract_progress.json"
+    progress = load_extract_progress(progress_file) if os.path.exists(partial_filename) else None
+    # Drop anything written after the last checkpoint (e.g. a half-written line)
+    if progress and not truncate_partial_extract(partial_filename, progress.get('offset')):
+        print(f"\n⚠️  Checkpoint {progress_file} does not match {partial_filename}. Starting a fresh extraction.")
+        progress = None
+    if progress:
+        print(f"\n-> Resuming interrupted extraction from checkpoint {progress_file}")
+        last_sync_time = progress.get('end_time') or last_sync_time
+        last_cursor = progress.get('after_cursor') or last_cursor
+    
+    # The cursor API does not report an end_time, so the extraction start
+    # time is used as a conservative fallback watermark
+    sync_started_at = (progress or {}).get('started_at') or int(datetime.now().timestamp())
+    
+    # Extract data, streaming each page to a partial JSON Lines file
+    with open(partial_filename, 'ab' if progress else 'wb') as output_file:
+        if cursor_file:
+            record_count, api_cursor = extract_incremental_cursor_endpoint(
+                resource,
+                cfg.zendesk.subdomain,
+                last_sync_time,
+                auth,
+                output_file,
+                last_cursor,
+                include_param,
+                progress_file,
+                sync_started_at
+            )
+            api_end_time = None
+        else:
+            record_count, api_end_time = extract_incremental_endpoint(
+                resource,
+                cfg.zendesk.subdomain,
+                last_sync_time,
+                auth,
+                output_file,
+                include_param,
+                progress_file,
+                sync_started_at
+            )
+    
+    # Keep fetched records (including any from before a resume) under their final name
+    if os.path.getsize(partial_filename) > 0:
         if api_end_time:
-            filename = f"{output_dir}/{resource}_until_{api_end_time}.json"
+            filename = f"{output_dir}/{resource}_until_{api_end_time}.jsonl"
         else:
-            filename = f"{output_dir}/{resource}_{int(datetime.now().timestamp())}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(all_records, f, ensure_ascii=False, indent=2)
-        print(f"\n-> All {len(all_records):,} records saved to {filename}")
+            filename = f"{output_dir}/{resource}_{int(datetime.now().timestamp())}.jsonl"
+        os.replace(partial_filename, filename)
+        print(f"\n-> Records saved to {filename} ({record_count:,} fetched in this run)")
+    else:
+        os.remove(partial_filename)
+    clear_extract_progress(progress_file)
     
     # Save the API's end_time
     if timestamp_file and api_end_time:
         save_sync_time(api_end_time, timestamp_file)
         print(f"-> New sync timestamp ({api_end_time}) saved to {timestamp_file}.")
     
-    print(f"\n✅ Successfully extracted {len(all_records) if all_records else 0} {resource}")
+    # Save the API's after_cursor (and fallback watermark)
+    if cursor_file and api_cursor:
+        save_sync_cursor(api_cursor, cursor_file)
+        print(f"-> New sync cursor saved to {cursor_file}.")
+        if timestamp_file:
+            save_sync_time(sync_started_at, timestamp_file)
+            print(f"-> New sync timestamp ({sync_started_at}) saved to {timestamp_file}.")
+    
+    print(f"\n✅ Successfully extracted {record_count} {resource}")
     return True
@@ -4,38 +4,71 @@ Load Functions
 Functions for loading data from Parquet and JSON files into PostgreSQL database.
 """
 
-import os
-import json
-import tempfile
+import io
+import orjson
+from contextlib import closing
+from functools import partial
 import pandas as pd
-import numpy as np
+import pyarrow as pa
 from typing import Optional, List, Tuple
 from datetime import datetime
-from psycopg2.extras import execute_values
 from psycopg2 import sql
 
 from utils.load_utils import (
     get_db_connection,
     table_exists,
     create_table_from_df,
+    ensure_table_logged,
     load_last_load_timestamp,
     save_last_load_timestamp,
-    parse_iso_timestamp,
+    parse_iso_timestamps,
     infer_schema,
-    add_missing_columns
+    add_missing_columns,
+    select_row_groups_updated_since,
+    read_parquet_sample,
+    infer_schema_for_existing_table,
+    cast_boolean_columns,
+    filter_batch_updated_since,
+    nested_columns,
+    dataframe_to_rows,
+    copy_rows_to_table,
+    create_staging_table,
+    merge_staging_table,
+    prefetch_batches,
+    ArrowTableReader,
+    open_parquet_source
 )
 
 # Default text columns that should be preserved as object dtype
 DEFAULT_TEXT_COLUMNS = ['description', 'title', 'type', 'name', 'email', 'subject', 'custom_field_options']
 
 
+def save_load_timestamp(table_name: str, timestamp: int, config_dir: str, after_commit: Optional[List] = None):
+    """
+    Save a table's load timestamp now, or once the caller's transaction commits.
+    
+    Args:
+        table_name: Name of the table
+        timestamp: Unix timestamp to save
+        config_dir: Directory where timestamp files are stored
+        after_commit: Optional list to append the save to instead of running it now
+    """
+    if after_commit is None:
+        save_last_load_timestamp(table_name, timestamp, config_dir)
+    else:
+        after_commit.append(partial(save_last_load_timestamp, table_name, timestamp, config_dir))
+
+
 def load_parquet_incremental(
-    parquet_path: Optional[str] = None,
+    parquet_path: Optional[str | ArrowTableReader] = None,
     table_name: str = None,
     primary_key: Optional[str | List[str] | Tuple[str, ...]] = None,
     batch_size: int = 10000,
+    commit_every: int = 10,
     updated_at_column: str = "updated_at",
-    config_dir: str = "./config"
+    config_dir: str = "./config",
+    conn=None,
+    after_commit: Optional[List] = None
 ):
     """
     Incremental load function for Parquet files to PostgreSQL.
@@ -47,13 +80,19 @@ def load_parquet_incremental(
     - Never truncates or replaces the table
     
     Args:
-        parquet_path: Path to the Parquet file
+        parquet_path: Path to the Parquet file (or an ArrowTableReader over in-memory data)
         table_name: Name of the PostgreSQL table
         primary_key: Optional primary key column name(s). Can be a string for single column,
                      or a list/tuple for composite primary key
         batch_size: Number of rows to insert per batch
+        commit_every: Number of batches to stage and upsert per transaction
         updated_at_column: Column name containing update timestamp (default: "updated_at")
         config_dir: Directory for storing load timestamps
+        conn: Optional existing PostgreSQL connection to reuse (left open for the caller).
+              A caller-provided connection is never committed or rolled back here;
+              the caller owns the transaction
+        after_commit: Optional list the load timestamp save is appended to (as a
+                      callable), to run once the caller has committed; saved immediately if None
         
     Returns:
         Number of rows loaded
@@ -67,28 +106,45 @@ def load_parquet_incremental(
     if not table_name:
         raise ValueError("table_name must be provided")
     
-    print(f"Loading Parquet incrementally from {parquet_path} to table {table_name}...")
+    source_name = parquet_path if isinstance(parquet_path, str) else "in-memory table"
+    print(f"Loading Parquet incrementally from {source_name} to table {table_name}...")
     
-    # Get database connection and cursor
-    conn = get_db_connection()
+    # Get database connection and cursor (reuse the caller's connection if provided)
+    owns_connection = conn is None
+    if owns_connection:
+        conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
         # Check if table exists
         table_already_exists = table_exists(conn, table_name)
         
-        # Read Parquet file to get schema
-        df_full = pd.read_parquet(parquet_path)
+        # Get last load timestamp
+        last_load_ts = load_last_load_timestamp(table_name, config_dir)
+        if last_load_ts > 0:
+            print(f"  Last load timestamp: {datetime.fromtimestamp(last_load_ts).isoformat()}")
+        else:
+            print("  No previous load found, loading all records...")
+        
+        # Open the Parquet file, skipping row groups whose updated_at statistics
+        # show they were already loaded
+        parquet_reader = open_parquet_source(parquet_path)
+        row_groups = select_row_groups_updated_since(parquet_reader, updated_at_column, last_load_ts)
         
         # Check if updated_at_column exists
-        if updated_at_column not in df_full.columns:
+        if updated_at_column not in parquet_reader.schema_arrow.names:
             raise ValueError(
                 f"updated_at_column '{updated_at_column}' not found in data. "
-                f"Available columns: {list(df_full.columns)}"
+                f"Available columns: {parquet_reader.schema_arrow.names}"
             )
         
-        # Infer schema: detect boolean columns and preserve text columns
-        df_sample, boolean_columns = infer_schema(df_full, sample_size=1000)
+        if table_already_exists:
+            # Take column types from the existing table; only new columns are inferred
+            df_sample, boolean_columns = infer_schema_for_existing_table(conn, parquet_reader, row_groups, table_name)
+        else:
+            # Infer schema from the first rows: detect boolean columns and preserve text columns
+            df_head = read_parquet_sample(parquet_reader, row_groups, sample_size=1000)
+            df_sample, boolean_columns = infer_schema(df_head, sample_size=1000)
         
         # Add _loaded_at column to sample for schema creation
         df_sample['_loaded_at'] = datetime.now()
@@ -96,17 +152,11 @@ def load_parquet_incremental(
         # Create table if it doesn't exist, otherwise add missing columns
         if not table_already_exists:
             print(f"  Table {table_name} does not exist, creating it...")
-            create_table_from_df(conn, df_sample, table_name, primary_key, "append")
+            # Created UNLOGGED for the very first bulk load only, switched to LOGGED at the end
+            create_table_from_df(conn, df_sample, table_name, primary_key, "append", unlogged=last_load_ts == 0, commit=owns_connection)
         else:
             # Table exists - add any missing columns
-            add_missing_columns(conn, df_sample, table_name)
-        
-        # Get last load timestamp
-        last_load_ts = load_last_load_timestamp(table_name, config_dir)
-        if last_load_ts > 0:
-            print(f"  Last load timestamp: {datetime.fromtimestamp(last_load_ts).isoformat()}")
-        else:
-            print("  No previous load found, loading all records...")
+            add_missing_columns(conn, df_sample, table_name, commit=owns_connection)
         
         # Track max updated_at timestamp
         max_updated_at = last_load_ts
@@ -117,122 +167,102 @@ def load_parquet_incremental(
         # Load data in batches
         total_rows = 0
         filtered_rows = 0
-        
-        # Reuse the already-read Parquet file
-        parquet_file = df_full
-        total_file_rows = len(parquet_file)
-        
-        # Process in batches
-        for start_idx in range(0, total_file_rows, batch_size):
-            end_idx = min(start_idx + batch_size, total_file_rows)
-            chunk = parquet_file.iloc[start_idx:end_idx].copy()
-            
-            # Add _loaded_at column with current timestamp
-            chunk['_loaded_at'] = current_timestamp
-            
-            # Ensure text columns are preserved as strings
-            for col in chunk.columns:
-                if col in DEFAULT_TEXT_COLUMNS:
+        batches_loaded = 0
+        
+        # Columns needing type coercion are the same for every batch, so pick them once
+        text_columns = [col for col in parquet_reader.schema_arrow.names if col in DEFAULT_TEXT_COLUMNS]
+        boolean_columns = [col for col in boolean_columns if col not in text_columns]
+        arrow_boolean_columns = [
+            col for col in boolean_columns
+            if pa.types.is_integer(parquet_reader.schema_arrow.field(col).type)
+            or pa.types.is_floating(parquet_reader.schema_arrow.field(col).type)
+            or pa.types.is_boolean(parquet_reader.schema_arrow.field(col).type)
+        ]
+        pandas_boolean_columns = [col for col in boolean_columns if col not in arrow_boolean_columns]
+        # Only nested Arrow columns can hold arrays/lists/dicts that need JSON conversion
+        json_columns = nested_columns(parquet_reader.schema_arrow)
+        
+        # Decode and transform batches on a background thread so Parquet decoding
+        # overlaps with COPY into Postgres
+        def prepare_batches():
+            nonlocal max_updated_at, filtered_rows
+            # Stream the selected row groups one batch at a time instead of reading the whole file
+            for record_batch in parquet_reader.iter_batches(batch_size=batch_size, row_groups=row_groups):
+                # Drop already-loaded rows in Arrow, before converting to pandas
+                if last_load_ts > 0:
+                    num_rows = record_batch.num_rows
+                    record_batch = filter_batch_updated_since(record_batch, updated_at_column, last_load_ts)
+                    filtered_rows += num_rows - record_batch.num_rows
+                
+                # Numeric boolean columns are converted in Arrow and come out as pandas 'boolean'
+                record_batch = cast_boolean_columns(record_batch, arrow_boolean_columns)
+                chunk = record_batch.to_pandas(types_mapper={pa.bool_(): pd.BooleanDtype()}.get)
+                
+                # Add _loaded_at column with current timestamp
+                chunk['_loaded_at'] = current_timestamp
+                
+                # Ensure text columns are preserved as strings
+                for col in text_columns:
                     chunk[col] = chunk[col].astype(str)
-                elif col in boolean_columns:
-                    # Convert boolean columns properly, handling NaN
+                # Convert remaining (non-numeric) boolean columns properly, handling NaN
+                for col in pandas_boolean_columns:
                     chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype('boolean')
-            
-            # Parse updated_at timestamps
-            chunk['_parsed_updated_at'] = chunk[updated_at_column].apply(parse_iso_timestamp)
-            
-            # Filter records updated since last load
-            if last_load_ts > 0:
-                # Keep records where updated_at > last_load_ts or updated_at is null (new records)
-                mask = (chunk['_parsed_updated_at'] > last_load_ts) | (chunk['_parsed_updated_at'].isna())
-                filtered_rows += (~mask).sum()
-                chunk = chunk[mask].copy()
-            
-            # Track max updated_at
-            if not chunk.empty:
-                valid_timestamps = chunk['_parsed_updated_at'].dropna()
-                if not valid_timestamps.empty:
-                    chunk_max = valid_timestamps.max()
-                    if pd.notna(chunk_max) and chunk_max > max_updated_at:
-                        max_updated_at = int(chunk_max)
-            
-            # Drop helper column
-            chunk = chunk.drop(columns=['_parsed_updated_at'])
-            
-            if chunk.empty:
-                continue
-            
-            # Convert NaN/NA to None for PostgreSQL
-            chunk = chunk.where(pd.notnull(chunk), None)
-            
-            # Convert pandas NAType (from nullable boolean) to None
-            for col in chunk.columns:
-                if chunk[col].dtype.name == 'boolean':
-                    chunk[col] = chunk[col].where(chunk[col].notna(), None)
-            
-            # Prepare data for insertion
-            columns = list(chunk.columns)
-            values = []
-            for _, row in chunk.iterrows():
-                row_values = []
-                for val in row:
-                    # Handle numpy arrays - convert to list/JSON for PostgreSQL
-                    if isinstance(val, np.ndarray):
-                        if val.size == 0:
-                            row_values.append(None)
-                        else:
-                            val_list = val.tolist()
-                            if isinstance(val_list, list):
-                                val_list = [None if (isinstance(v, float) and pd.isna(v)) else v for v in val_list]
-                            row_values.append(json.dumps(val_list) if val_list else None)
-                    # Handle lists/dicts - convert to JSON string for PostgreSQL
-                    elif isinstance(val, (list, dict)):
-                        row_values.append(json.dumps(val) if val else None)
-                    # Handle scalar NaN values
-                    else:
-                        try:
-                            if pd.isna(val):
-                                row_values.append(None)
-                            elif str(type(val).__name__) == 'NAType':
-                                row_values.append(None)
-                            else:
-                                row_values.append(val)
-                        except (ValueError, TypeError):
-                            row_values.append(val)
-                values.append(tuple(row_values))
-            
-            # Build insert query with ON CONFLICT handling
-            if primary_key:
-                # Handle composite primary key
-                if isinstance(primary_key, str):
-                    pk_columns_str = primary_key
-                    pk_columns_list = [primary_key]
-                elif isinstance(primary_key, (list, tuple)):
-                    pk_columns_str = ", ".join(primary_key)
-                    pk_columns_list = list(primary_key)
-                else:
-                    pk_columns_str = str(primary_key)
-                    pk_columns_list = [primary_key]
                 
-                update_columns = [col for col in columns if col not in pk_columns_list]
-                insert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(columns)})
-                    VALUES %s
-                    ON CONFLICT ({pk_columns_str}) DO UPDATE SET
-                        {', '.join([f"{col} = EXCLUDED.{col}" for col in update_columns])}
-                """
-            else:
-                insert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(columns)})
-                    VALUES %s
-                """
-            
-            # Execute batch insert
-            execute_values(cursor, insert_query, values)
+                # Parse updated_at timestamps into a plain int64 array (null -> -1)
+                parsed = parse_iso_timestamps(chunk[updated_at_column])
+                parsed_null = parsed.isna().to_numpy()
+                parsed_ts = parsed.to_numpy(dtype='int64', na_value=-1)
+                
+                # Filter records updated since last load
+                if last_load_ts > 0:
+                    # Keep records where updated_at > last_load_ts or updated_at is null (new records)
+                    mask = parsed_null | (parsed_ts > last_load_ts)
+                    filtered_rows += int((~mask).sum())
+                    chunk = chunk[mask]
+                    parsed_ts = parsed_ts[mask]
+                
+                # Track max updated_at (nulls are -1, so they never win)
+                if len(parsed_ts) > 0:
+                    max_updated_at = max(max_updated_at, int(parsed_ts.max()))
+                
+                if chunk.empty:
+                    continue
+                
+                # Convert the batch column by column (NaN -> None, arrays/lists/dicts -> JSON)
+                yield dataframe_to_rows(chunk, json_columns)
+        
+        # With a primary key, batches are staged and upserted together every
+        # commit_every batches; without one they are copied straight into the table
+        staging_table = create_staging_table(cursor, table_name) if primary_key else None
+        columns = None
+        # CSV buffer reused for every batch's COPY
+        copy_buffer = io.StringIO()
+        
+        with closing(prefetch_batches(prepare_batches())) as batches:
+            for columns, values in batches:
+                # Bulk-load the batch with COPY
+                copy_rows_to_table(cursor, staging_table or table_name, columns, values, copy_buffer)
+                
+                # Upsert and commit every commit_every batches instead of after each one
+                batches_loaded += 1
+                if batches_loaded % commit_every == 0:
+                    if staging_table:
+                        merge_staging_table(cursor, table_name, staging_table, columns, primary_key)
+                    if owns_connection:
+                        conn.commit()
+                
+                total_rows += len(values)
+                print(f"  Loaded {total_rows} rows...", end='\r')
+        
+        if staging_table:
+            if columns is not None and batches_loaded % commit_every != 0:
+                merge_staging_table(cursor, table_name, staging_table, columns, primary_key)
+            cursor.execute(f"DROP TABLE {staging_table}")
+        
+        # Write a freshly created table to WAL once, now that it is fully loaded
+        ensure_table_logged(cursor, table_name)
+        if owns_connection:
             conn.commit()
-            
-            total_rows += len(chunk)
-            print(f"  Loaded {total_rows} rows...", end='\r')
         
         # Print filtered rows summary
         if filtered_rows > 0:
@@ -241,28 +271,31 @@ def load_parquet_incremental(
         # Always save load timestamp for incremental loads
         if total_rows > 0:
             if max_updated_at > last_load_ts:
-                save_last_load_timestamp(table_name, max_updated_at, config_dir)
+                save_load_timestamp(table_name, max_updated_at, config_dir, after_commit)
                 print(f"  Saved load timestamp: {datetime.fromtimestamp(max_updated_at).isoformat()}")
             else:
                 # If no new records but we loaded some (e.g., null timestamps), save current timestamp
                 current_ts = int(current_timestamp.timestamp())
-                save_last_load_timestamp(table_name, current_ts, config_dir)
+                save_load_timestamp(table_name, current_ts, config_dir, after_commit)
                 print(f"  Saved load timestamp: {current_timestamp.isoformat()}")
         elif last_load_ts == 0:
             # First load with no data - save current timestamp
             current_ts = int(current_timestamp.timestamp())
-            save_last_load_timestamp(table_name, current_ts, config_dir)
+            save_load_timestamp(table_name, current_ts, config_dir, after_commit)
             print(f"  Saved initial load timestamp: {current_timestamp.isoformat()}")
         
         print(f"\n✅ Successfully loaded {total_rows} rows into {table_name} (incremental)")
         return total_rows
         
     except Exception as e:
-        conn.rollback()
+        # A caller-provided connection is rolled back by the caller
+        if owns_connection:
+            conn.rollback()
         raise e
     finally:
         cursor.close()
-        conn.close()
+        if owns_connection:
+            conn.close()
 
 
 def load_json_incremental(
@@ -271,13 +304,15 @@ def load_json_incremental(
     primary_key: Optional[str | List[str] | Tuple[str, ...]] = None,
     batch_size: int = 10000,
     updated_at_column: str = "updated_at",
-    config_dir: str = "./config"
+    config_dir: str = "./config",
+    conn=None,
+    after_commit: Optional[List] = None
 ):
     """
     Incremental load function for JSON files to PostgreSQL.
     
     This function is specifically designed for incremental loads only. It converts
-    the JSON file to Parquet format and uses load_parquet_incremental internally.
+    the JSON file to an in-memory Arrow table and uses load_parquet_incremental internally.
     
     Args:
         json_path: Path to the JSON file (should be a list of objects)
@@ -287,6 +322,11 @@ def load_json_incremental(
         batch_size: Number of rows to insert per batch
         updated_at_column: Column name containing update timestamp (default: "updated_at")
         config_dir: Directory for storing load timestamps
+        conn: Optional existing PostgreSQL connection to reuse (left open for the caller).
+              A caller-provided connection is never committed or rolled back here;
+              the caller owns the transaction
+        after_commit: Optional list the load timestamp save is appended to (as a
+                      callable), to run once the caller has committed; saved immediately if None
         
     Returns:
         Number of rows loaded
@@ -294,8 +334,8 @@ def load_json_incremental(
     print(f"Loading JSON incrementally from {json_path} to table {table_name}...")
     
     # Read JSON file
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(json_path, 'rb') as f:
+        data = orjson.loads(f.read())
     
     if not isinstance(data, list):
         raise ValueError("JSON file must contain a list of objects")
@@ -313,25 +353,18 @@ def load_json_incremental(
     # Add _loaded_at column to DataFrame
     df['_loaded_at'] = datetime.now()
     
-    # Use Parquet incremental loading logic with temporary Parquet file
-    with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp_file:
-        # Write Parquet - text columns will be preserved as strings
-        df.to_parquet(tmp_file.name, index=False)
-        tmp_path = tmp_file.name
-    
-    try:
-        rows_loaded = load_parquet_incremental(
-            parquet_path=tmp_path,
-            table_name=table_name,
-            primary_key=primary_key,
-            batch_size=batch_size,
-            updated_at_column=updated_at_column,
-            config_dir=config_dir
-        )
-        return rows_loaded
-    finally:
-        # Clean up temporary file
-        os.unlink(tmp_path)
+    # Use Parquet incremental loading logic directly on an in-memory Arrow table
+    # (text columns will be preserved as strings)
+    return load_parquet_incremental(
+        parquet_path=ArrowTableReader(pa.Table.from_pandas(df, preserve_index=False)),
+        table_name=table_name,
+        primary_key=primary_key,
+        batch_size=batch_size,
+        updated_at_column=updated_at_column,
+        config_dir=config_dir,
+        conn=conn,
+        after_commit=after_commit
+    )
 
 
 # def load_csv_to_postgres(
@@ -515,29 +548,38 @@ def load_json_incremental(
 
 
 def load_parquet_to_postgres(
-    parquet_path: Optional[str] = None,
+    parquet_path: Optional[str | ArrowTableReader] = None,
     table_name: str = None,
     primary_key: Optional[str | List[str] | Tuple[str, ...]] = None,
     if_exists: str = "replace",
     batch_size: int = 10000,
+    commit_every: int = 10,
     incremental: bool = False,
     updated_at_column: str = "_loaded_at",
-    config_dir: str = "./config"
+    config_dir: str = "./config",
+    conn=None,
+    after_commit: Optional[List] = None
 ):
     """
     Load a Parquet file into a PostgreSQL table.
     
     Args:
-        parquet_path: Path to the Parquet file (preferred)
+        parquet_path: Path to the Parquet file, or an ArrowTableReader over in-memory data (preferred)
         csv_path: Path to the Parquet file (for backward compatibility, same as parquet_path)
         table_name: Name of the PostgreSQL table
         primary_key: Optional primary key column name(s). Can be a string for single column,
                      or a list/tuple for composite primary key
         if_exists: What to do if table exists ("replace", "append", "fail", "incremental")
         batch_size: Number of rows to insert per batch
+        commit_every: Number of batches to stage and upsert per transaction
         incremental: If True, only load records updated since last load
         updated_at_column: Column name containing update timestamp
         config_dir: Directory for storing load timestamps
+        conn: Optional existing PostgreSQL connection to reuse (left open for the caller).
+              A caller-provided connection is never committed or rolled back here;
+              the caller owns the transaction
+        after_commit: Optional list the load timestamp save is appended to (as a
+                      callable), to run once the caller has committed; saved immediately if None
         
     Returns:
         Number of rows loaded
@@ -550,22 +592,40 @@ def load_parquet_to_postgres(
         raise ValueError("table_name must be provided")
     
     mode = "incremental" if incremental else if_exists
-    print(f"Loading Parquet from {file_path} to table {table_name} (mode: {mode})...")
+    source_name = file_path if isinstance(file_path, str) else "in-memory table"
+    print(f"Loading Parquet from {source_name} to table {table_name} (mode: {mode})...")
     
-    # Get database connection and cursor
-    conn = get_db_connection()
+    # Get database connection and cursor (reuse the caller's connection if provided)
+    owns_connection = conn is None
+    if owns_connection:
+        conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
         # Check if table exists first
         table_already_exists = table_exists(conn, table_name)
         
-        # Read Parquet file to get schema - Parquet preserves types better than CSV
-        df_full = pd.read_parquet(file_path)
+        # For incremental loads, get last load timestamp and filter data
+        last_load_ts = 0
+        if incremental:
+            last_load_ts = load_last_load_timestamp(table_name, config_dir)
+            if last_load_ts > 0:
+                print(f"  Last load timestamp: {datetime.fromtimestamp(last_load_ts).isoformat()}")
+            else:
+                print("  No previous load found, loading all records...")
         
-        # Infer schema: detect boolean columns and preserve text columns
-        # infer_schema will automatically sample for schema detection
-        df_sample, boolean_columns = infer_schema(df_full, sample_size=1000)
+        # Open the Parquet file - Parquet preserves types better than CSV
+        # Incremental loads skip row groups whose updated_at statistics show they were already loaded
+        parquet_reader = open_parquet_source(file_path)
+        row_groups = select_row_groups_updated_since(parquet_reader, updated_at_column, last_load_ts)
+        
+        if table_already_exists and (incremental or if_exists != "replace"):
+            # The table is kept, so take column types from it; only new columns are inferred
+            df_sample, boolean_columns = infer_schema_for_existing_table(conn, parquet_reader, row_groups, table_name)
+        else:
+            # Infer schema from the first rows: detect boolean columns and preserve text columns
+            df_head = read_parquet_sample(parquet_reader, row_groups, sample_size=1000)
+            df_sample, boolean_columns = infer_schema(df_head, sample_size=1000)
         
         # Add _loaded_at column to sample for schema creation
         df_sample['_loaded_at'] = datetime.now()
@@ -574,29 +634,23 @@ def load_parquet_to_postgres(
         # In incremental mode, we should never drop/replace the table
         if not table_already_exists:
             # Table doesn't exist, create it (use "append" mode to avoid dropping)
-            create_table_from_df(conn, df_sample, table_name, primary_key, "append")
+            # Created UNLOGGED for the very first bulk load only, switched to LOGGED at the end
+            create_table_from_df(conn, df_sample, table_name, primary_key, "append", unlogged=last_load_ts == 0, commit=owns_connection)
         elif if_exists == "replace" and not incremental:
             # Table exists and we want to replace it (non-incremental mode)
-            create_table_from_df(conn, df_sample, table_name, primary_key, if_exists)
+            # Kept LOGGED: SET LOGGED afterwards would rewrite the whole table into the WAL anyway
+            create_table_from_df(conn, df_sample, table_name, primary_key, if_exists, commit=owns_connection)
         elif table_already_exists and incremental:
             # Table exists and we're in incremental mode - add any missing columns
-            add_missing_columns(conn, df_sample, table_name)
+            add_missing_columns(conn, df_sample, table_name, commit=owns_connection)
         
         # If replacing and table existed, truncate it first (only in non-incremental mode)
         if table_already_exists and if_exists == "replace" and not incremental:
             cursor.execute(sql.SQL("TRUNCATE TABLE {}").format(
                 sql.Identifier(table_name)
             ))
-            conn.commit()
-        
-        # For incremental loads, get last load timestamp and filter data
-        last_load_ts = 0
-        if incremental:
-            last_load_ts = load_last_load_timestamp(table_name, config_dir)
-            if last_load_ts > 0:
-                print(f"  Last load timestamp: {datetime.fromtimestamp(last_load_ts).isoformat()}")
-            else:
-                print("  No previous load found, loading all records...")
+            if owns_connection:
+                conn.commit()
         
         # Track max updated_at timestamp for both incremental and full loads
         # This allows future incremental loads to know where to start
@@ -608,145 +662,111 @@ def load_parquet_to_postgres(
         # Load data in batches
         total_rows = 0
         filtered_rows = 0
-        
-        # Reuse the already-read Parquet file
-        parquet_file = df_full
-        total_file_rows = len(parquet_file)
-        
-        # Process in batches
-        for start_idx in range(0, total_file_rows, batch_size):
-            end_idx = min(start_idx + batch_size, total_file_rows)
-            chunk = parquet_file.iloc[start_idx:end_idx].copy()
-            
-            # Add _loaded_at column with current timestamp
-            chunk['_loaded_at'] = current_timestamp
-            
-            # Ensure text columns are preserved as strings
-            for col in chunk.columns:
-                if col in DEFAULT_TEXT_COLUMNS:
+        batches_loaded = 0
+        
+        # Columns needing type coercion are the same for every batch, so pick them once
+        text_columns = [col for col in parquet_reader.schema_arrow.names if col in DEFAULT_TEXT_COLUMNS]
+        boolean_columns = [col for col in boolean_columns if col not in text_columns]
+        arrow_boolean_columns = [
+            col for col in boolean_columns
+            if pa.types.is_integer(parquet_reader.schema_arrow.field(col).type)
+            or pa.types.is_floating(parquet_reader.schema_arrow.field(col).type)
+            or pa.types.is_boolean(parquet_reader.schema_arrow.field(col).type)
+        ]
+        pandas_boolean_columns = [col for col in boolean_columns if col not in arrow_boolean_columns]
+        # Only nested Arrow columns can hold arrays/lists/dicts that need JSON conversion
+        json_columns = nested_columns(parquet_reader.schema_arrow)
+        
+        # Decode and transform batches on a background thread so Parquet decoding
+        # overlaps with COPY into Postgres
+        def prepare_batches():
+            nonlocal max_updated_at, filtered_rows
+            # Stream the selected row groups one batch at a time instead of reading the whole file
+            for record_batch in parquet_reader.iter_batches(batch_size=batch_size, row_groups=row_groups):
+                # Drop already-loaded rows in Arrow, before converting to pandas
+                if incremental and last_load_ts > 0:
+                    num_rows = record_batch.num_rows
+                    record_batch = filter_batch_updated_since(record_batch, updated_at_column, last_load_ts)
+                    filtered_rows += num_rows - record_batch.num_rows
+                
+                # Numeric boolean columns are converted in Arrow and come out as pandas 'boolean'
+                record_batch = cast_boolean_columns(record_batch, arrow_boolean_columns)
+                chunk = record_batch.to_pandas(types_mapper={pa.bool_(): pd.BooleanDtype()}.get)
+                
+                # Add _loaded_at column with current timestamp
+                chunk['_loaded_at'] = current_timestamp
+                
+                # Ensure text columns are preserved as strings
+                for col in text_columns:
                     chunk[col] = chunk[col].astype(str)
-                elif col in boolean_columns:
-                    # Convert boolean columns properly, handling NaN
+                # Convert remaining (non-numeric) boolean columns properly, handling NaN
+                for col in pandas_boolean_columns:
                     chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype('boolean')
-            
-            # Track max updated_at timestamp for both incremental and full loads
-            # This is needed to save the timestamp for future incremental loads
-            if updated_at_column in chunk.columns:
-                # Parse updated_at timestamps
-                chunk['_parsed_updated_at'] = chunk[updated_at_column].apply(parse_iso_timestamp)
                 
-                # For incremental loads, filter by updated_at
-                if incremental:
-                    # Filter records updated since last load
-                    if last_load_ts > 0:
-                        # Keep records where updated_at > last_load_ts or updated_at is null (new records)
-                        mask = (chunk['_parsed_updated_at'] > last_load_ts) | (chunk['_parsed_updated_at'].isna())
-                        filtered_rows += (~mask).sum()
-                        chunk = chunk[mask].copy()
+                # Track max updated_at timestamp for both incremental and full loads
+                # This is needed to save the timestamp for future incremental loads
+                if updated_at_column in chunk.columns:
+                    # Parse updated_at timestamps into a plain int64 array (null -> -1)
+                    parsed = parse_iso_timestamps(chunk[updated_at_column])
+                    parsed_null = parsed.isna().to_numpy()
+                    parsed_ts = parsed.to_numpy(dtype='int64', na_value=-1)
+                    
+                    # For incremental loads, filter by updated_at
+                    if incremental:
+                        # Filter records updated since last load
+                        if last_load_ts > 0:
+                            # Keep records where updated_at > last_load_ts or updated_at is null (new records)
+                            mask = parsed_null | (parsed_ts > last_load_ts)
+                            filtered_rows += int((~mask).sum())
+                            chunk = chunk[mask]
+                            parsed_ts = parsed_ts[mask]
+                    
+                    # Track max updated_at (for both incremental and full loads; nulls are -1, so they never win)
+                    if len(parsed_ts) > 0:
+                        max_updated_at = max(max_updated_at, int(parsed_ts.max()))
+                elif incremental:
+                    # Only warn in incremental mode if updated_at_column is missing
+                    print(f"⚠️  Warning: {updated_at_column} column not found. Loading all records.")
                 
-                # Track max updated_at (for both incremental and full loads)
-                if not chunk.empty:
-                    valid_timestamps = chunk['_parsed_updated_at'].dropna()
-                    if not valid_timestamps.empty:
-                        chunk_max = valid_timestamps.max()
-                        if pd.notna(chunk_max) and chunk_max > max_updated_at:
-                            max_updated_at = int(chunk_max)
+                if chunk.empty:
+                    continue
                 
-                # Drop helper column
-                chunk = chunk.drop(columns=['_parsed_updated_at'])
-            elif incremental:
-                # Only warn in incremental mode if updated_at_column is missing
-                print(f"⚠️  Warning: {updated_at_column} column not found. Loading all records.")
-            
-            if chunk.empty:
-                continue
-            
-            # Convert NaN/NA to None for PostgreSQL
-            # Handle pandas nullable boolean types (BooleanDtype) which use NAType
-            chunk = chunk.where(pd.notnull(chunk), None)
-            
-            # Convert pandas NAType (from nullable boolean) to None
-            # This handles cases where nullable boolean columns have NAType objects
-            for col in chunk.columns:
-                if chunk[col].dtype.name == 'boolean':
-                    # Convert NAType to None for psycopg2 compatibility
-                    chunk[col] = chunk[col].where(chunk[col].notna(), None)
-            
-            # Prepare data for insertion
-            columns = list(chunk.columns)
-            # Convert to list of tuples, ensuring NAType is converted to None
-            values = []
-            for _, row in chunk.iterrows():
-                row_values = []
-                for val in row:
-                    # Handle numpy arrays - convert to list/JSON for PostgreSQL
-                    if isinstance(val, np.ndarray):
-                        # Convert array to list, handling NaN values
-                        if val.size == 0:
-                            row_values.append(None)
-                        else:
-                            # Convert array to list, replacing NaN with None
-                            val_list = val.tolist()
-                            # Recursively handle NaN in nested structures
-                            if isinstance(val_list, list):
-                                val_list = [None if (isinstance(v, float) and pd.isna(v)) else v for v in val_list]
-                            row_values.append(json.dumps(val_list) if val_list else None)
-                    # Handle lists/dicts - convert to JSON string for PostgreSQL
-                    elif isinstance(val, (list, dict)):
-                        # Convert lists/dicts to JSON string for PostgreSQL
-                        row_values.append(json.dumps(val) if val else None)
-                    # Handle scalar NaN values
-                    else:
-                        # Check for NaN/NA - use try/except to handle edge cases
-                        try:
-                            # pd.isna works for scalars but may raise ValueError for arrays
-                            # We already handled arrays above, so this should be safe
-                            if pd.isna(val):
-                                row_values.append(None)
-                            elif str(type(val).__name__) == 'NAType':
-                                row_values.append(None)
-                            else:
-                                row_values.append(val)
-                        except (ValueError, TypeError):
-                            # If pd.isna raises an error (e.g., ambiguous truth value),
-                            # assume it's a valid value (we should have caught arrays above)
-                            row_values.append(val)
-                values.append(tuple(row_values))
-            
-            # Build insert query
-            # Use ON CONFLICT if primary key exists to handle duplicates
-            # This handles both incremental/append mode and duplicate records within the same load
-            if primary_key:
-                # Handle composite primary key
-                if isinstance(primary_key, str):
-                    pk_columns_str = primary_key
-                    pk_columns_list = [primary_key]
-                elif isinstance(primary_key, (list, tuple)):
-                    pk_columns_str = ", ".join(primary_key)
-                    pk_columns_list = list(primary_key)
-                else:
-                    pk_columns_str = str(primary_key)
-                    pk_columns_list = [primary_key]
+                # Convert the batch column by column (NaN -> None, arrays/lists/dicts -> JSON)
+                yield dataframe_to_rows(chunk, json_columns)
+        
+        # With a primary key, batches are staged and upserted together every
+        # commit_every batches (handling both incremental/append mode and duplicate
+        # records within the same load); without one they are copied straight in
+        staging_table = create_staging_table(cursor, table_name) if primary_key else None
+        columns = None
+        # CSV buffer reused for every batch's COPY
+        copy_buffer = io.StringIO()
+        
+        with closing(prefetch_batches(prepare_batches())) as batches:
+            for columns, values in batches:
+                # Bulk-load the batch with COPY
+                copy_rows_to_table(cursor, staging_table or table_name, columns, values, copy_buffer)
                 
-                update_columns = [col for col in columns if col not in pk_columns_list]
-                insert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(columns)})
-                    VALUES %s
-                    ON CONFLICT ({pk_columns_str}) DO UPDATE SET
-                        {', '.join([f"{col} = EXCLUDED.{col}" for col in update_columns])}
-                """
-            else:
-                insert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(columns)})
-                    VALUES %s
-                """
-            
-            # Execute batch insert
-            execute_values(cursor, insert_query, values)
+                # Upsert and commit every commit_every batches instead of after each one
+                batches_loaded += 1
+                if batches_loaded % commit_every == 0:
+                    if staging_table:
+                        merge_staging_table(cursor, table_name, staging_table, columns, primary_key)
+                    if owns_connection:
+                        conn.commit()
+                
+                total_rows += len(values)
+                print(f"  Loaded {total_rows} rows...", end='\r')
+        
+        if staging_table:
+            if columns is not None and batches_loaded % commit_every != 0:
+                merge_staging_table(cursor, table_name, staging_table, columns, primary_key)
+            cursor.execute(f"DROP TABLE {staging_table}")
+        
+        # Write a freshly created table to WAL once, now that it is fully loaded
+        ensure_table_logged(cursor, table_name)
+        if owns_connection:
             conn.commit()
-            
-            total_rows += len(chunk)
-            print(f"  Loaded {total_rows} rows...", end='\r')
         
         if incremental:
             print(f"\n  Filtered out {filtered_rows} rows (already loaded)")
@@ -756,25 +776,28 @@ def load_parquet_to_postgres(
         if total_rows > 0:
             if max_updated_at > last_load_ts:
                 # Save the maximum updated_at timestamp from the loaded data
-                save_last_load_timestamp(table_name, max_updated_at, config_dir)
+                save_load_timestamp(table_name, max_updated_at, config_dir, after_commit)
                 print(f"  Saved load timestamp: {datetime.fromtimestamp(max_updated_at).isoformat()}")
             elif not incremental:
                 # For full loads, if we loaded data but max_updated_at wasn't updated 
                 # (e.g., no updated_at column or all values are null),
                 # save current timestamp as fallback
                 current_ts = int(current_timestamp.timestamp())
-                save_last_load_timestamp(table_name, current_ts, config_dir)
+                save_load_timestamp(table_name, current_ts, config_dir, after_commit)
                 print(f"  Saved load timestamp: {current_timestamp.isoformat()}")
         
         print(f"\n✅ Successfully loaded {total_rows} rows into {table_name}")
         return total_rows
         
     except Exception as e:
-        conn.rollback()
+        # A caller-provided connection is rolled back by the caller
+        if owns_connection:
+            conn.rollback()
         raise e
     finally:
         cursor.close()
-        conn.close()
+        if owns_connection:
+            conn.close()
 
 
 
@@ -786,7 +809,9 @@ def load_json_to_postgres(
     batch_size: int = 10000,
     incremental: bool = False,
     updated_at_column: str = "_loaded_at",
-    config_dir: str = "./config"
+    config_dir: str = "./config",
+    conn=None,
+    after_commit: Optional[List] = None
 ):
     """
     Load a JSON file into a PostgreSQL table.
@@ -801,6 +826,11 @@ def load_json_to_postgres(
         incremental: If True, only load records updated since last load
         updated_at_column: Column name containing update timestamp
         config_dir: Directory for storing load timestamps
+        conn: Optional existing PostgreSQL connection to reuse (left open for the caller).
+              A caller-provided connection is never committed or rolled back here;
+              the caller owns the transaction
+        after_commit: Optional list the load timestamp save is appended to (as a
+                      callable), to run once the caller has committed; saved immediately if None
         
     Returns:
         Number of rows loaded
@@ -808,8 +838,8 @@ def load_json_to_postgres(
     print(f"Loading JSON from {json_path} to table {table_name}...")
     
     # Read JSON file
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(json_path, 'rb') as f:
+        data = orjson.loads(f.read())
     
     if not isinstance(data, list):
         raise ValueError("JSON file must contain a list of objects")
@@ -829,9 +859,10 @@ def load_json_to_postgres(
     
     # Create table schema directly from DataFrame to ensure correct types
     # Use a sample that preserves object dtypes for text columns
-    conn = get_db_connection()
+    owns_connection = conn is None
+    db_conn = get_db_connection() if owns_connection else conn
     try:
-        table_already_exists = table_exists(conn, table_name)
+        table_already_exists = table_exists(db_conn, table_name)
         # In incremental mode, we should never drop/replace the table
         if not table_already_exists:
             # Table doesn't exist, create it (use "append" mode to avoid dropping)
@@ -839,38 +870,30 @@ def load_json_to_postgres(
             # Infer schema on sample to ensure consistency
             df_sample, _ = infer_schema(df_sample, sample_size=10)
             # _loaded_at is already in df_sample from df
-            create_table_from_df(conn, df_sample, table_name, primary_key, "append")
+            create_table_from_df(db_conn, df_sample, table_name, primary_key, "append", commit=owns_connection)
         elif if_exists == "replace" and not incremental:
             # Table exists and we want to replace it (non-incremental mode)
             df_sample = df.head(10).copy() if len(df) > 10 else df.copy()
             # Infer schema on sample to ensure consistency
             df_sample, _ = infer_schema(df_sample, sample_size=10)
             # _loaded_at is already in df_sample from df
-            create_table_from_df(conn, df_sample, table_name, primary_key, if_exists)
-        conn.close()
-    except Exception as e:
-        conn.close()
-        raise e
-    
-    # Use Parquet loading logic with temporary Parquet file
-    with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp_file:
-        # Write Parquet - text columns will be preserved as strings
-        df.to_parquet(tmp_file.name, index=False)
-        tmp_path = tmp_file.name
-    
-    try:
-        rows_loaded = load_parquet_to_postgres(
-            parquet_path=tmp_path,
-            table_name=table_name,
-            primary_key=primary_key,
-            if_exists=if_exists,
-            batch_size=batch_size,
-            incremental=incremental,
-            updated_at_column=updated_at_column,
-            config_dir=config_dir
-        )
-        return rows_loaded
+            create_table_from_df(db_conn, df_sample, table_name, primary_key, if_exists, commit=owns_connection)
     finally:
-        # Clean up temporary file
-        os.unlink(tmp_path)
+        if owns_connection:
+            db_conn.close()
+    
+    # Use Parquet loading logic directly on an in-memory Arrow table
+    # (text columns will be preserved as strings)
+    return load_parquet_to_postgres(
+        parquet_path=ArrowTableReader(pa.Table.from_pandas(df, preserve_index=False)),
+        table_name=table_name,
+        primary_key=primary_key,
+        if_exists=if_exists,
+        batch_size=batch_size,
+        incremental=incremental,
+        updated_at_column=updated_at_column,
+        config_dir=config_dir,
+        conn=conn,
+        after_commit=after_commit
+    )
 
@@ -0,0 +1,74 @@
+"""
+Combined Load Script
+
+Loads transformed data for all endpoints to PostgreSQL over a single
+database connection and in a single transaction, instead of one connection
+and several commits per endpoint. Supports both full and incremental loading modes.
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.load_utils import get_db_connection
+from etl.ticket_fields import load as ticket_fields_load
+from etl.organizations import load as organizations_load
+from etl.users import load as users_load
+from etl.tickets import load as tickets_load
+
+# Endpoint load functions, in dependency order
+LOAD_MAINS = (
+    ticket_fields_load.main,
+    organizations_load.main,
+    users_load.main,
+    tickets_load.main,
+)
+
+
+def main(incremental=False, overrides=None):
+    """
+    Main load function for all endpoints.
+    
+    Every endpoint is loaded in one transaction that is committed once at the
+    end, so a failure in any endpoint rolls back all of them. Load timestamps
+    are only saved after that commit.
+    
+    Args:
+        incremental: If True, use incremental loading mode (also enabled by INCREMENTAL_LOAD=true)
+        overrides: Optional list of extra Hydra overrides (defaults to none)
+    """
+    conn = get_db_connection()
+    after_commit = []
+    try:
+        for load_main in LOAD_MAINS:
+            load_main(incremental=incremental, overrides=overrides, conn=conn, after_commit=after_commit)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        print("\n❌ Combined load failed, rolled back all endpoints")
+        raise
+    finally:
+        # Closing without a commit (e.g. after sys.exit in an endpoint loader) discards the transaction
+        conn.close()
+    
+    # Advance the load timestamps only once the data they describe is committed
+    for save_load_timestamp in after_commit:
+        save_load_timestamp()
+    
+    print("\n✅ Successfully loaded all endpoints to PostgreSQL")
+
+
+if __name__ == "__main__":
+    # Filter out --incremental from Hydra overrides (Hydra doesn't understand it)
+    main(
+        incremental="--incremental" in sys.argv,
+        overrides=[arg for arg in sys.argv[1:] if arg != "--incremental"]
+    )
@@ -5,13 +5,11 @@ Transforms organizations data into flattened Parquet.
 """
 
 import pandas as pd
-import json
 import os
 import sys
 import re
 from datetime import datetime
 from dotenv import load_dotenv
-from hydra import compose, initialize
 
 # Load environment variables
 load_dotenv()
@@ -21,105 +19,101 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.transform_utils import load_latest_file_from_dir, deduplicate_dataframe, export_to_parquet
+from etl.config import compose_config
+from utils.transform_utils import load_latest_file_from_dir, load_records_from_file, deduplicate_dataframe, export_to_parquet
 from utils.extract_utils import save_sync_time
 from etl.transform import create_id_mapping
 
 
 def flatten_organizations(orgs_data, transformed_at):
     """
-    Flatten organization data into a list of dictionaries.
+    Flatten organization data into a DataFrame.
+    
+    Columns are selected from the records in one pass by the DataFrame
+    constructor instead of building a dictionary per organization.
     
     Args:
         orgs_data: List of organization dictionaries from JSON
         transformed_at: ISO datetime string indicating when the data was transformed
         
     Returns:
-        List of flattened organization records
+        DataFrame of flattened organization records
     """
-    flattened_data = []
-    for org in orgs_data:
-        flat_record = {
-            "organization_id": org.get("id"),
-            "name": org.get("name"),
-            "domain_names": org.get("domain_names"),
-            "created_at": org.get("created_at"),
-            "updated_at": org.get("updated_at"),
-            "_transformed_at": transformed_at,
-        }
-        flattened_data.append(flat_record)
-    return flattened_data
+    df = pd.DataFrame(orgs_data, columns=["id", "name", "domain_names", "created_at", "updated_at"])
+    df = df.rename(columns={"id": "organization_id"})
+    df["_transformed_at"] = transformed_at
+    return df
 
 
-def main():
-    """Main transformation function for organizations."""
-    # Initialize Hydra
-    config_path = os.path.relpath(os.path.join(project_root, "config", "hydra"), os.path.dirname(__file__))
-    with initialize(config_path=config_path, version_base=None):
-        cfg = compose(config_name="config", overrides=["endpoint=organizations"] + sys.argv[1:])
-        
-        data_dir = cfg.paths.data_dir
-        config_dir = cfg.paths.config_dir
-        extract_path = cfg.extract["organizations"]
-        transform_path = cfg.transform["organizations"]
-        
-        input_dir = f"{data_dir}/{extract_path}"
-        output_dir = f"{data_dir}/{transform_path}"
-        os.makedirs(output_dir, exist_ok=True)
-        os.makedirs(config_dir, exist_ok=True)
-        
-        print(f"\n{'='*60}")
-        print(f"Transforming organizations")
-        print(f"{'='*60}")
-        
-        # Find latest organizations file
-        # Try both patterns: organizations_{timestamp}.json (simple) and organizations_until_{timestamp}.json (incremental)
-        file_name = load_latest_file_from_dir(input_dir, file_pattern="organizations_*.json")
-        if not file_name:
-            file_name = load_latest_file_from_dir(input_dir, file_pattern="organizations_until_*.json")
-        
-        if not file_name:
-            print("❌ Cannot proceed without organizations data file.")
-            sys.exit(1)
-        
-        # Load organizations data
-        with open(file_name, 'r', encoding='utf-8') as f:
-            orgs_data = json.load(f)
-        
-        print(f"Loaded {len(orgs_data)} organizations from {file_name}")
-        
-        # Get current timestamp for transformation
-        transformed_at = datetime.now().isoformat()
-        timestamp = int(datetime.now().timestamp())
-        
-        # Create organization ID to name mapping
-        org_mapping = create_id_mapping(
-            data=orgs_data,
-            output_dir=output_dir,
-            timestamp=timestamp,
-            mapping_name="organization_map",
-            key_extractor=lambda org: org.get("id"),
-            value_extractor=lambda org: org.get("name"),
-            entity_name="organizations"
-        )
-        
-        # Basic transformation - flatten organization data
-        flattened_data = flatten_organizations(orgs_data, transformed_at=transformed_at)
-        
-        # Convert to DataFrame and deduplicate
-        df = pd.DataFrame(flattened_data)
-        df, _ = deduplicate_dataframe(
-            df,
-            primary_key_column='organization_id',
-            updated_at_column='updated_at',
-            entity_name='organizations'
-        )
-        
-        # Export to Parquet
-        export_to_parquet(df, output_dir, "organizations", timestamp=timestamp)
-        print(f"\n✅ Successfully transformed organizations")
+def main(overrides=None):
+    """
+    Main transformation function for organizations.
+    
+    Args:
+        overrides: Optional list of extra Hydra overrides (defaults to none)
+    """
+    # Compose Hydra config
+    cfg = compose_config("organizations", overrides)
+    
+    data_dir = cfg.paths.data_dir
+    config_dir = cfg.paths.config_dir
+    extract_path = cfg.extract["organizations"]
+    transform_path = cfg.transform["organizations"]
+    
+    input_dir = f"{data_dir}/{extract_path}"
+    output_dir = f"{data_dir}/{transform_path}"
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(config_dir, exist_ok=True)
+    
+    print(f"\n{'='*60}")
+    print(f"Transforming organizations")
+    print(f"{'='*60}")
+    
+    # Find latest organizations file
+    # Matches organizations_{timestamp}.json (simple) and organizations_until_{timestamp}.jsonl (incremental)
+    file_name = load_latest_file_from_dir(input_dir, file_pattern="organizations_*.json*")
+    
+    if not file_name:
+        print("❌ Cannot proceed without organizations data file.")
+        sys.exit(1)
+    
+    # Load organizations data
+    orgs_data = load_records_from_file(file_name)
+    
+    print(f"Loaded {len(orgs_data)} organizations from {file_name}")
+    
+    # Get current timestamp for transformation (one clock read so both forms agree)
+    now = datetime.now()
+    transformed_at = now.isoformat()
+    timestamp = int(now.timestamp())
+    
+    # Create organization ID to name mapping
+    org_mapping = create_id_mapping(
+        data=orgs_data,
+        output_dir=output_dir,
+        timestamp=timestamp,
+        mapping_name="organization_map",
+        key_field="id",
+        value_field="name",
+        entity_name="organizations"
+    )
+    
+    # Basic transformation - flatten organization data
+    df = flatten_organizations(orgs_data, transformed_at=transformed_at)
+    
+    # Deduplicate
+    df, _ = deduplicate_dataframe(
+        df,
+        primary_key_column='organization_id',
+        updated_at_column='updated_at',
+        entity_name='organizations'
+    )
+    
+    # Export to Parquet
+    export_to_parquet(df, output_dir, "organizations", timestamp=timestamp)
+    print(f"\n✅ Successfully transformed organizations")
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
 
@@ -8,7 +8,6 @@ Supports both full and incremental loading modes.
 import os
 import sys
 from dotenv import load_dotenv
-from hydra import compose, initialize
 
 # Load environment variables
 load_dotenv()
@@ -18,55 +17,66 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from etl.config import compose_config
 from etl.load import load_parquet_to_postgres
 from utils.transform_utils import load_latest_file_from_dir
 
 
-def main():
-    """Main load function for tickets."""
+def main(incremental=False, overrides=None, conn=None, after_commit=None):
+    """
+    Main load function for tickets.
+    
+    Args:
+        incremental: If True, use incremental loading mode (also enabled by INCREMENTAL_LOAD=true)
+        overrides: Optional list of extra Hydra overrides (defaults to none)
+        conn: Optional existing PostgreSQL connection to reuse (defaults to a new connection).
+              The caller commits it; the loader does not
+        after_commit: Optional list collecting load timestamp saves to run after the caller commits
+    """
     # Check for incremental flag
-    incremental = "--incremental" in sys.argv or os.getenv("INCREMENTAL_LOAD", "false").lower() == "true"
+    incremental = incremental or os.getenv("INCREMENTAL_LOAD", "false").lower() == "true"
     
-    # Filter out --incremental from Hydra overrides (Hydra doesn't understand it)
-    hydra_overrides = [arg for arg in sys.argv[1:] if arg != "--incremental"]
+    # Compose Hydra config
+    cfg = compose_config("tickets", overrides)
+    
+    data_dir = cfg.paths.data_dir
+    config_dir = cfg.paths.config_dir
+    transform_path = cfg.transform["tickets"]
+    
+    transform_dir = f"{data_dir}/{transform_path}"
+    
+    mode_str = "incremental" if incremental else "full"
+    print(f"\n{'='*60}")
+    print(f"Loading tickets to PostgreSQL ({mode_str} mode)")
+    print(f"{'='*60}")
     
-    # Initialize Hydra
-    config_path = os.path.relpath(os.path.join(project_root, "config", "hydra"), os.path.dirname(__file__))
-    with initialize(config_path=config_path, version_base=None):
-        cfg = compose(config_name="config", overrides=["endpoint=tickets"] + hydra_overrides)
-        
-        data_dir = cfg.paths.data_dir
-        config_dir = cfg.paths.config_dir
-        transform_path = cfg.transform["tickets"]
-        
-        transform_dir = f"{data_dir}/{transform_path}"
-        
-        mode_str = "incremental" if incremental else "full"
-        print(f"\n{'='*60}")
-        print(f"Loading tickets to PostgreSQL ({mode_str} mode)")
-        print(f"{'='*60}")
-        
-        # Find latest tickets Parquet file
-        parquet_file = load_latest_file_from_dir(transform_dir, file_pattern="tickets_*.parquet")
-        
-        if not parquet_file:
-            print("❌ Cannot proceed without tickets Parquet file.")
-            sys.exit(1)
-        
-        # Load to PostgreSQL
-        load_parquet_to_postgres(
-            parquet_path=parquet_file,
-            table_name="tickets",
-            primary_key=["ticket_id", "_loaded_at"],
-            if_exists="replace",
-            incremental=incremental,
-            updated_at_column="updated_at",
-            config_dir=config_dir
-        )
-        
-        print(f"\n✅ Successfully loaded tickets to PostgreSQL")
+    # Find latest tickets Parquet file
+    parquet_file = load_latest_file_from_dir(transform_dir, file_pattern="tickets_*.parquet")
+    
+    if not parquet_file:
+        print("❌ Cannot proceed without tickets Parquet file.")
+        sys.exit(1)
+    
+    # Load to PostgreSQL
+    load_parquet_to_postgres(
+        parquet_path=parquet_file,
+        table_name="tickets",
+        primary_key=["ticket_id", "_loaded_at"],
+        if_exists="replace",
+        incremental=incremental,
+        updated_at_column="updated_at",
+        config_dir=config_dir,
+        conn=conn,
+        after_commit=after_commit
+    )
+    
+    print(f"\n✅ Successfully loaded tickets to PostgreSQL")
 
 
 if __name__ == "__main__":
-    main()
+    # Filter out --incremental from Hydra overrides (Hydra doesn't understand it)
+    main(
+        incremental="--incremental" in sys.argv,
+        overrides=[arg for arg in sys.argv[1:] if arg != "--incremental"]
+    )
 
@@ -5,12 +5,11 @@ Transforms tickets data into flattened Parquet.
 """
 
 import pandas as pd
-import json
+import orjson
 import os
 import sys
 from datetime import datetime
 from dotenv import load_dotenv
-from hydra import compose, initialize
 
 # Load environment variables
 load_dotenv()
@@ -20,12 +19,55 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from utils.transform_utils import load_latest_file_from_dir, deduplicate_dataframe, export_to_parquet
+from etl.config import compose_config
+from utils.transform_utils import (
+    load_latest_file_from_dir,
+    load_records_from_file,
+    deduplicate_dataframe,
+    export_to_parquet
+)
+
+
+def sanitize_field_name(field_name):
+    """
+    Sanitize a custom field name for use as a column name.
+    
+    Args:
+        field_name: Field name from the field map
+        
+    Returns:
+        Field name with spaces and special characters replaced by underscores
+    """
+    # Replace spaces and special chars with underscores
+    field_name = field_name.replace(" ", "_").replace("/", "_").replace("-", "_")
+    # Remove any other non-alphanumeric characters except underscores
+    return "".join(c if c.isalnum() or c == "_" else "_" for c in field_name)
+
+
+def resolve_user_id(ticket, role):
+    """
+    Get a ticket's user ID for a role, preferring a side-loaded user object's id.
+    
+    Args:
+        ticket: Ticket dictionary
+        role: "assignee", "requester" or "submitter"
+        
+    Returns:
+        User ID, or None if the ticket has none
+    """
+    user_obj = ticket.get(role)
+    if user_obj and isinstance(user_obj, dict):
+        return user_obj.get("id") or ticket.get(f"{role}_id")
+    return ticket.get(f"{role}_id")
 
 
 def flatten_tickets(ticket_data, field_map=None, transformed_at=None):
     """
-    Flatten ticket data into a list of dictionaries.
+    Flatten ticket data into a DataFrame.
+    
+    Base columns are selected from the records in one pass by the DataFrame
+    constructor; custom field names are sanitized once per field ID rather than
+    once per ticket.
     
     Args:
         ticket_data: List of ticket dictionaries from JSON
@@ -33,142 +75,120 @@ def flatten_tickets(ticket_data, field_map=None, transformed_at=None):
         transformed_at: ISO datetime string indicating when the data was transformed
         
     Returns:
-        List of flattened ticket records
+        DataFrame of flattened ticket records
     """
-    flattened_data = []
-    
-    for ticket in ticket_data:
-        # Get IDs
-        org_id = ticket.get("organization_id")
-        requester_id = ticket.get("requester_id")
-        assignee_id = ticket.get("assignee_id")
-        submitter_id = ticket.get("submitter_id")
-        
-        # Also check if assignee/requester are objects with id
-        assignee_obj = ticket.get("assignee")
-        if assignee_obj and isinstance(assignee_obj, dict):
-            assignee_id = assignee_obj.get("id") or assignee_id
-        
-        requester_obj = ticket.get("requester")
-        if requester_obj and isinstance(requester_obj, dict):
-            requester_id = requester_obj.get("id") or requester_id
-        
-        submitter_obj = ticket.get("submitter")
-        if submitter_obj and isinstance(submitter_obj, dict):
-            submitter_id = submitter_obj.get("id") or submitter_id
-        
-        flat_record = {
-            "ticket_id": ticket.get("id"),
-            "subject": ticket.get("subject"),
-            "description": ticket.get("description"),
-            "status": ticket.get("status"),
-            "priority": ticket.get("priority"),
-            "created_at": ticket.get("created_at"),
-            "updated_at": ticket.get("updated_at"),
-            "organization_id": org_id,
-            "requester_id": requester_id,
-            "assignee_id": assignee_id,
-            "submitter_id": submitter_id,
-        }
-        
-        # Add transformed_at timestamp if provided
-        if transformed_at:
-            flat_record["_transformed_at"] = transformed_at
-        
-        # Process custom_fields using field_map
-        if field_map:
-            custom_fields = ticket.get("custom_fields", [])
-            for field in custom_fields:
+    df = pd.DataFrame(ticket_data, columns=[
+        "id", "subject", "description", "status", "priority", "created_at", "updated_at",
+        "organization_id", "requester_id", "assignee_id", "submitter_id"
+    ])
+    df = df.rename(columns={"id": "ticket_id"})
+    
+    # Also check if assignee/requester/submitter are side-loaded objects with id
+    for role in ("assignee", "requester", "submitter"):
+        if any(isinstance(ticket.get(role), dict) for ticket in ticket_data):
+            df[f"{role}_id"] = [resolve_user_id(ticket, role) for ticket in ticket_data]
+    
+    # Add transformed_at timestamp if provided
+    if transformed_at:
+        df["_transformed_at"] = transformed_at
+    
+    # Process custom_fields using field_map
+    if field_map:
+        # Column name for each field ID, falling back to the field ID if not in the map
+        column_names = {}
+        custom_records = []
+        for ticket in ticket_data:
+            custom_record = {}
+            for field in ticket.get("custom_fields") or []:
                 field_id = str(field.get("id"))
-                field_value = field.get("value")
-                
-                # Get field name from mapping, fallback to field_id if not found
-                field_name = field_map.get(field_id, f"custom_field_{field_id}")
-                
-                # Sanitize field name for CSV column (replace spaces and special chars with underscores)
-                field_name = field_name.replace(" ", "_").replace("/", "_").replace("-", "_")
-                # Remove any other non-alphanumeric characters except underscores
-                field_name = "".join(c if c.isalnum() or c == "_" else "_" for c in field_name)
-                
-                flat_record[field_name] = field_value
-        
-        flattened_data.append(flat_record)
+                column_name = column_names.get(field_id)
+                if column_name is None:
+                    column_name = sanitize_field_name(field_map.get(field_id, f"custom_field_{field_id}"))
+                    column_names[field_id] = column_name
+                custom_record[column_name] = field.get("value")
+            custom_records.append(custom_record)
+        
+        custom_df = pd.DataFrame(custom_records, index=df.index)
+        # Custom fields named like a base column overwrite it, as before
+        df = pd.concat([df.drop(columns=[col for col in custom_df.columns if col in df.columns]), custom_df], axis=1)
     
-    return flattened_data
+    return df
 
 
-def main():
-    """Main transformation function for tickets."""
-    # Initialize Hydra
-    config_path = os.path.relpath(os.path.join(project_root, "config", "hydra"), os.path.dirname(__file__))
-    with initialize(config_path=config_path, version_base=None):
-        cfg = compose(config_name="config", overrides=["endpoint=tickets"] + sys.argv[1:])
-        
-        data_dir = cfg.paths.data_dir
-        extract_path = cfg.extract["tickets"]
-        transform_path = cfg.transform["tickets"]
-        
-        input_dir = f"{data_dir}/{extract_path}"
-        output_dir = f"{data_dir}/{transform_path}"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        print(f"\n{'='*60}")
-        print(f"Transforming tickets")
-        print(f"{'='*60}")
-        
-        # Load ticket data
-        # Try both patterns: tickets_{timestamp}.json (simple) and tickets_until_{timestamp}.json (incremental)
-        file_name = load_latest_file_from_dir(input_dir, file_pattern="tickets_*.json")
-        if not file_name:
-            file_name = load_latest_file_from_dir(input_dir, file_pattern="tickets_until_*.json")
-        
-        if not file_name:
-            print("❌ Cannot proceed without ticket data file.")
-            sys.exit(1)
-        
-        # Load ticket data
-        ticket_data_df = pd.read_json(file_name)
-        ticket_data = ticket_data_df.to_dict('records')
-        print(f"Loaded {len(ticket_data)} tickets from {file_name}")
-        
-        # Get current timestamp for transformation
-        transformed_at = datetime.now().isoformat()
-        
-        # Load field map for custom_fields mapping
-        fields_transform_path = cfg.transform["ticket_fields"]
-        fields_output_dir = f"{data_dir}/{fields_transform_path}/mappings"
-        field_map_file = load_latest_file_from_dir(fields_output_dir, file_pattern="field_map_*.json")
-        
-        field_map = None
-        if field_map_file and os.path.exists(field_map_file):
-            with open(field_map_file, 'r', encoding='utf-8') as f:
-                field_map = json.load(f)
-            print(f"Loaded field map with {len(field_map)} fields from {field_map_file}")
-        else:
-            print("⚠️  Warning: Field map not found. Custom fields will not be mapped.")
-        
-        # Flatten the data
-        print(f"\nStarting transformation of {len(ticket_data)} records...")
-        flattened_data = flatten_tickets(ticket_data, field_map=field_map, transformed_at=transformed_at)
-        print("Transformation complete.")
-        
-        # Convert to DataFrame for deduplication
-        df = pd.DataFrame(flattened_data)
-        
-        # Deduplicate by ticket_id, keeping the most recent version (highest updated_at)
-        df, _ = deduplicate_dataframe(
-            df, 
-            primary_key_column='ticket_id', 
-            updated_at_column='updated_at',
-            entity_name='tickets'
-        )
-        
-        # Export to Parquet
-        export_to_parquet(df, output_dir, "tickets")
-        print(f"✅ Final record count: {len(df)} tickets")
-        print(f"\n✅ Successfully transformed tickets")
+def main(overrides=None):
+    """
+    Main transformation function for tickets.
+    
+    Args:
+        overrides: Optional list of extra Hydra overrides (defaults to none)
+    """
+    # Compose Hydra config
+    cfg = compose_config("tickets", overrides)
+    
+    data_dir = cfg.paths.data_dir
+    extract_path = cfg.extract["tickets"]
+    transform_path = cfg.transform["tickets"]
+    
+    input_dir = f"{data_dir}/{extract_path}"
+    output_dir = f"{data_dir}/{transform_path}"
+    os.makedirs(output_dir, exist_ok=True)
+    
+    print(f"\n{'='*60}")
+    print(f"Transforming tickets")
+    print(f"{'='*60}")
+    
+    # Load ticket data
+    # Matches tickets_{timestamp}.json (simple) and tickets_{timestamp}.jsonl (incremental)
+    file_name = load_latest_file_from_dir(input_dir, file_pattern="tickets_*.json*")
+    
+    if not file_name:
+        print("❌ Cannot proceed without ticket data file.")
+        sys.exit(1)
+    
+    # Load ticket data as plain dicts (no DataFrame round trip before flattening)
+    ticket_data = load_records_from_file(file_name)
+    print(f"Loaded {len(ticket_data)} tickets from {file_name}")
+    
+    # Get current timestamp for transformation
+    transformed_at = datetime.now().isoformat()
+    
+    # Load field map for custom_fields mapping
+    fields_transform_path = cfg.transform["ticket_fields"]
+    fields_output_dir = f"{data_dir}/{fields_transform_path}/mappings"
+    field_map_file = load_latest_file_from_dir(fields_output_dir, file_pattern="field_map_*.json")
+    
+    field_map = None
+    if field_map_file and os.path.exists(field_map_file):
+        with open(field_map_file, 'rb') as f:
+            field_map = orjson.loads(f.read())
+        print(f"Loaded field map with {len(field_map)} fields from {field_map_file}")
+    else:
+        print("⚠️  Warning: Field map not found. Custom fields will not be mapped.")
+    
+    # Flatten the data
+    print(f"\nStarting transformation of {len(ticket_data)} records...")
+    df = flatten_tickets(ticket_data, field_map=field_map, transformed_at=transformed_at)
+    print("Transformation complete.")
+    
+    # Keep timestamp columns typed as datetimes, as pd.read_json used to produce them
+    for col in ("created_at", "updated_at"):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True, errors='coerce')
+    
+    # Deduplicate by ticket_id, keeping the most recent version (highest updated_at)
+    df, _ = deduplicate_dataframe(
+        df, 
+        primary_key_column='ticket_id', 
+        updated_at_column='updated_at',
+        entity_name='tickets'
+    )
+    
+    # Export to Parquet
+    export_to_parquet(df, output_dir, "tickets")
+    print(f"✅ Final record count: {len(df)} tickets")
+    print(f"\n✅ Successfully transformed tickets")
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
 
@@ -5,11 +5,13 @@ This module provides reusable transformation functions for all Zendesk endpoints
 Endpoint-specific transform.py files import and use these functions.
 """
 
-import json
 import os
 
+import orjson
 
-def create_id_mapping(data, output_dir, timestamp, mapping_name, key_extractor, value_extractor, entity_name):
+
+def create_id_mapping(data, output_dir, timestamp, mapping_name, key_extractor=None, value_extractor=None,
+                      entity_name="records", key_field="id", value_field="name"):
     """
     Creates a generic ID to value mapping from data records.
     
@@ -18,28 +20,38 @@ def create_id_mapping(data, output_dir, timestamp, mapping_name, key_extractor,
         output_dir: Directory to save mapping file
         timestamp: Timestamp for filename
         mapping_name: Name prefix for mapping file (e.g., "organization_map", "user_map", "field_map")
-        key_extractor: Function to extract the key (ID) from a record
-        value_extractor: Function to extract the value (name/title) from a record
+        key_extractor: Optional function to extract the key (ID) from a record
+        value_extractor: Optional function to extract the value (name/title) from a record
         entity_name: Name of entity type for logging (e.g., "organizations", "users", "fields")
+        key_field: Record field used as the key when no extractors are given (default: "id")
+        value_field: Record field used as the value when no extractors are given (default: "name")
         
     Returns:
         Dictionary mapping key to value
     """
     print(f"\n--- Creating {entity_name.capitalize()} ID Mapping ---")
     
-    mapping = {}
-    for record in data:
-        key = key_extractor(record)
-        value = value_extractor(record)
-        if key:
-            mapping[key] = value
+    if key_extractor is None and value_extractor is None:
+        # Plain field lookups: a single dict comprehension, no per-record lambda calls
+        mapping = {r[key_field]: r.get(value_field) for r in data if r.get(key_field)}
+    else:
+        key_extractor = key_extractor or (lambda record: record.get(key_field))
+        value_extractor = value_extractor or (lambda record: record.get(value_field))
+        mapping = {}
+        for record in data:
+            key = key_extractor(record)
+            value = value_extractor(record)
+            if key:
+                mapping[key] = value
     
     # Save mapping
     if mapping:
         os.makedirs(f"{output_dir}/mappings", exist_ok=True)
         mapping_file = f"{output_dir}/mappings/{mapping_name}_{timestamp}.json"
-        with open(mapping_file, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, ensure_ascii=False, indent=2)
+        with open(mapping_file, 'wb') as f:
+            # Mappings are only read back by scripts, so skip indentation;
+            # OPT_NON_STR_KEYS writes integer IDs as string keys, like json.dump did
+            f.write(orjson.dumps(mapping, option=orjson.OPT_NON_STR_KEYS))
         print(f"-> {entity_name.capitalize()} ID mapping saved: {mapping_file} ({len(mapping)} {entity_name})")
     
     return mapping
@@ -0,0 +1,155 @@
+"""
+Zendesk HTTP Client
+
+Shared requests.Session used by all extraction functions, so concurrent extract
+tasks in the same process reuse pooled keep-alive connections to Zendesk
+instead of opening a new TLS connection per request.
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+
+# (connect, read) timeout in seconds for Zendesk API requests
+REQUEST_TIMEOUT = (5, 60)
+
+
+def create_session(pool_connections=8, pool_maxsize=16):
+    """
+    Create a requests.Session with an HTTPS connection pool and retries.
+    
+    Transient server errors (5xx) are retried with backoff by the adapter.
+    Rate limits (429) are not retried here; get_with_retry() handles them
+    using the Retry-After header.
+    
+    Compressed responses are requested for every encoding urllib3 can decode in
+    this environment (gzip and deflate, plus br/zstd when brotli/zstandard are
+    installed), since export pages are large and highly compressible JSON.
+    
+    Args:
+        pool_connections: Number of connection pools to cache
+        pool_maxsize: Maximum number of connections to keep per pool
+        
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=5,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False
+    )
+    session = requests.Session()
+    session.headers.update({
+        'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
+        'User-Agent': 'zendesk-etl/0.1.0'
+    })
+    session.mount("https://", HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry))
+    return session
+
+
+# Module-level session shared by all extract tasks running in this process
+SESSION = create_session()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that spaces out requests to a steady rate.
+    
+    Tokens refill continuously at `rate` per second up to `capacity`, so short
+    bursts go through immediately while sustained traffic is held to the rate.
+    """
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """
+        Takes one token, sleeping until it is available.
+        
+        Returns:
+            Number of seconds waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+# Token buckets keyed by Zendesk host, shared by all extract tasks in this process
+_RATE_LIMITERS = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def configure_rate_limit(subdomain, requests_per_minute, burst=10):
+    """
+    Registers the shared request budget for a Zendesk subdomain.
+    
+    The first call for a subdomain wins, so concurrent extract tasks all share
+    the same bucket.
+    
+    Args:
+        subdomain: Zendesk subdomain
+        requests_per_minute: Sustained request rate allowed across all tasks
+        burst: Number of requests allowed back-to-back before pacing starts
+        
+    Returns:
+        TokenBucket for the subdomain
+    """
+    host = f"{subdomain}.zendesk.com"
+    with _RATE_LIMITERS_LOCK:
+        if host not in _RATE_LIMITERS:
+            _RATE_LIMITERS[host] = TokenBucket(requests_per_minute / 60, burst)
+        return _RATE_LIMITERS[host]
+
+
+def get_with_retry(url, auth, headers=None, max_attempts=6, max_retry_after=60):
+    """
+    GET a Zendesk URL on the shared session, retrying rate-limited (429) responses.
+    
+    Waits for the Retry-After header (capped at max_retry_after) plus a random
+    jitter that grows exponentially with each attempt, so concurrent extract
+    tasks do not all retry in lockstep. Server errors (5xx) are already retried
+    by the session's adapter. Each attempt first takes a token from the host's
+    shared bucket when one has been registered with configure_rate_limit().
+    
+    Args:
+        url: URL to fetch
+        auth: Authentication tuple (email/token, api_token)
+        headers: Optional extra request headers
+        max_attempts: Maximum number of requests before giving up
+        max_retry_after: Upper bound in seconds on the honoured Retry-After value
+        
+    Returns:
+        requests.Response (still 429 if every attempt was rate limited)
+    """
+    rate_limiter = _RATE_LIMITERS.get(urlsplit(url).hostname)
+    for attempt in range(max_attempts):
+        if rate_limiter:
+            rate_limiter.acquire()
+        response = SESSION.get(url, auth=auth, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 429 or attempt == max_attempts - 1:
+            return response
+        
+        retry_after = min(int(response.headers.get('Retry-After', 60)), max_retry_after)
+        delay = retry_after + random.uniform(0, 2 ** attempt)
+        print(f"!!! Rate limit hit. Waiting for {delay:.1f} seconds (attempt {attempt + 1}/{max_attempts})...")
+        time.sleep(delay)
+    return response
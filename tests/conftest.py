@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: make the project packages (etl, utils) importable.
+"""
+
+import os
+import sys
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
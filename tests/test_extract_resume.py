@@ -0,0 +1,91 @@
+"""
+Tests for resuming an interrupted incremental extraction from its checkpoint.
+"""
+
+import orjson
+import pytest
+
+import etl.extract as extract
+from utils.extract_utils import load_extract_progress, truncate_partial_extract
+from utils.transform_utils import load_records_from_file
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response carrying one export page."""
+
+    def __init__(self, payload):
+        self.content = orjson.dumps(payload)
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+def make_pages(first_id, page_count, per_page=2):
+    """Builds incremental export pages keyed by URL, chained through next_page."""
+    pages = {}
+    for i in range(page_count):
+        start = first_id + i * per_page
+        last = i == page_count - 1
+        pages[f"page{start}"] = {
+            "users": [{"id": start + j, "name": f"user {start + j}"} for j in range(per_page)],
+            "end_time": 1000 + start,
+            "next_page": None if last else f"page{start + per_page}",
+            "end_of_stream": last,
+        }
+    return pages
+
+
+def serve_pages(monkeypatch, pages, first_url, fail_on=None):
+    """Routes fetch_page to the fake pages; the first URL is the API start URL."""
+    def fake_fetch_page(url, auth, previous_response=None):
+        key = first_url if "api/v2" in url else url
+        if key == fail_on:
+            raise RuntimeError("process killed")
+        return FakeResponse(pages[key])
+    monkeypatch.setattr(extract, "fetch_page", fake_fetch_page)
+
+
+def test_resume_truncates_half_written_line(tmp_path, monkeypatch):
+    partial_file = tmp_path / "users_in_progress.jsonl.part"
+    progress_file = tmp_path / "users_extract_progress.json"
+    pages = make_pages(first_id=1, page_count=3)
+
+    # First run: pages 1 and 2 are written and checkpointed, then fetching page 3 dies
+    serve_pages(monkeypatch, pages, first_url="page1", fail_on="page5")
+    with open(partial_file, "wb") as output_file:
+        with pytest.raises(RuntimeError):
+            extract.extract_incremental_endpoint(
+                "users", "example", 0, ("a", "b"), output_file,
+                progress_file=str(progress_file), started_at=1
+            )
+        # The process is killed after a page past the checkpoint was partly written
+        output_file.write(b'{"id": 5, "name": "user 5"}\n{"id": 6, "na')
+
+    progress = load_extract_progress(str(progress_file))
+    assert progress["end_time"] == 1003
+    assert truncate_partial_extract(str(partial_file), progress["offset"])
+
+    # Resumed run fetches page 3 again from the checkpointed end_time
+    serve_pages(monkeypatch, pages, first_url="page5")
+    with open(partial_file, "ab") as output_file:
+        record_count, end_time = extract.extract_incremental_endpoint(
+            "users", "example", progress["end_time"], ("a", "b"), output_file,
+            progress_file=str(progress_file), started_at=1
+        )
+
+    assert (record_count, end_time) == (2, 1005)
+    # run_extraction renames the finished partial file before transforms read it
+    final_file = tmp_path / "users_until_1005.jsonl"
+    partial_file.rename(final_file)
+    records = load_records_from_file(str(final_file))
+    assert [record["id"] for record in records] == [1, 2, 3, 4, 5, 6]
+
+
+def test_truncate_rejects_missing_or_out_of_range_offset(tmp_path):
+    partial_file = tmp_path / "users_in_progress.jsonl.part"
+    partial_file.write_bytes(b'{"id": 1}\n')
+
+    assert not truncate_partial_extract(str(partial_file), None)
+    assert not truncate_partial_extract(str(partial_file), 100)
+    assert partial_file.read_bytes() == b'{"id": 1}\n'
@@ -0,0 +1,212 @@
+"""
+Tests for the pure helpers in utils/load_utils.py (no database needed).
+"""
+
+import csv
+import io
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from utils.load_utils import (
+    STAGING_SEQUENCE_COLUMN,
+    build_merge_statement,
+    copy_rows_to_table,
+    create_staging_table,
+    format_copy_value,
+    parse_iso_timestamp,
+    parse_iso_timestamps,
+    filter_batch_updated_since,
+    select_row_groups_updated_since,
+    to_db_value,
+)
+
+
+class RecordingCursor:
+    """Cursor stand-in that records executed SQL and COPY input."""
+
+    def __init__(self):
+        self.statements = []
+        self.copy_sql = None
+        self.copy_data = None
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+    def copy_expert(self, statement, file):
+        self.copy_sql = statement
+        self.copy_data = file.read()
+
+
+@pytest.fixture
+def new_york_time(monkeypatch):
+    """Runs the test with a local time zone that observes DST."""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available on this platform")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_parse_iso_timestamps_matches_scalar_parser(new_york_time):
+    values = pd.Series([
+        "2025-09-05T09:40:36Z",
+        "2025-08-26 03:52:27+00:00",
+        "2025-01-15T12:00:00",  # naive, standard time (UTC-5)
+        "2025-07-15T12:00:00",  # naive, daylight saving time (UTC-4)
+        "2025-09-05",  # date only, local midnight
+        None,
+        "not a timestamp",
+    ])
+
+    parsed = parse_iso_timestamps(values)
+
+    assert [None if pd.isna(v) else int(v) for v in parsed] == [parse_iso_timestamp(v) for v in values]
+
+
+def test_parse_iso_timestamps_treats_naive_datetimes_as_local_time(new_york_time):
+    values = pd.Series(pd.to_datetime(["2025-01-15 12:00:00", "2025-07-15 12:00:00"]))
+
+    parsed = parse_iso_timestamps(values)
+
+    assert list(parsed) == [parse_iso_timestamp("2025-01-15T12:00:00"), parse_iso_timestamp("2025-07-15T12:00:00")]
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, ''),
+    ('', '""'),
+    ('plain', '"plain"'),
+    ('say "hi"', '"say ""hi"""'),
+    ('tab\there', '"tab\there"'),
+    ('line\nbreak\r\n', '"line\nbreak\r\n"'),
+    ('back\\slash \\N', '"back\\slash \\N"'),
+    ('a,b', '"a,b"'),
+    (3.0, '"3"'),
+    (2.5, '"2.5"'),
+    (42, '"42"'),
+    (True, '"True"'),
+])
+def test_format_copy_value(value, expected):
+    assert format_copy_value(value) == expected
+
+
+def test_copy_rows_round_trips_through_csv():
+    json_value = to_db_value({"note": 'quote " tab \t newline \n backslash \\', "tags": ["a", "b"]})
+    rows = [
+        (1, 'multi\nline "text"', json_value),
+        (2, '', None),
+    ]
+    cursor = RecordingCursor()
+
+    copy_rows_to_table(cursor, "_staging_users", ["user_id", "name", "details"], rows)
+
+    assert cursor.copy_sql == "COPY _staging_users (user_id, name, details) FROM STDIN WITH (FORMAT csv)"
+    parsed = list(csv.reader(io.StringIO(cursor.copy_data)))
+    assert parsed == [["1", 'multi\nline "text"', json_value], ["2", "", ""]]
+    # NULL is an unquoted empty field; an empty string stays quoted
+    assert cursor.copy_data.endswith('"2","",\n')
+
+
+def test_copy_rows_reuses_buffer():
+    buffer = io.StringIO()
+    cursor = RecordingCursor()
+
+    copy_rows_to_table(cursor, "t", ["a"], [("first",), ("second",)], buffer=buffer)
+    copy_rows_to_table(cursor, "t", ["a"], [("third",)], buffer=buffer)
+
+    assert cursor.copy_data == '"third"\n'
+
+
+def test_staging_table_numbers_rows_in_copy_order():
+    cursor = RecordingCursor()
+
+    staging_table = create_staging_table(cursor, "users")
+
+    assert staging_table == "_staging_users"
+    assert cursor.statements == [
+        "DROP TABLE IF EXISTS _staging_users",
+        "CREATE TEMP TABLE _staging_users (LIKE users INCLUDING DEFAULTS)",
+        f"ALTER TABLE _staging_users ADD COLUMN {STAGING_SEQUENCE_COLUMN} BIGINT GENERATED ALWAYS AS IDENTITY",
+    ]
+
+
+def normalize_sql(statement):
+    return " ".join(statement.split())
+
+
+def test_merge_statement_keeps_latest_staged_row_per_key():
+    statement = normalize_sql(build_merge_statement(
+        "users", "_staging_users", ("user_id", "name", "email"), ("user_id",)
+    ))
+
+    assert statement == normalize_sql(f"""
+        INSERT INTO users (user_id, name, email)
+        SELECT DISTINCT ON (user_id) user_id, name, email FROM _staging_users
+        ORDER BY user_id, {STAGING_SEQUENCE_COLUMN} DESC
+        ON CONFLICT (user_id) DO UPDATE SET
+            name = EXCLUDED.name, email = EXCLUDED.email
+    """)
+    assert "ctid" not in statement
+
+
+def test_merge_statement_composite_key_is_not_updated():
+    statement = normalize_sql(build_merge_statement(
+        "ticket_tags", "_staging_ticket_tags", ("ticket_id", "tag", "_loaded_at"), ("ticket_id", "tag")
+    ))
+
+    assert f"ORDER BY ticket_id, tag, {STAGING_SEQUENCE_COLUMN} DESC" in statement
+    assert statement.endswith("ON CONFLICT (ticket_id, tag) DO UPDATE SET _loaded_at = EXCLUDED._loaded_at")
+
+
+# Six rows updated at noon UTC on 2025-01-01 .. 2025-01-06, two per row group
+UPDATED_AT = [datetime(2025, 1, day, 12, tzinfo=timezone.utc) for day in range(1, 7)]
+UPDATED_AT_COLUMNS = {
+    "string": pa.array([dt.strftime("%Y-%m-%dT%H:%M:%SZ") for dt in UPDATED_AT]),
+    "timestamp": pa.array(UPDATED_AT, type=pa.timestamp("ns", tz="UTC")),
+}
+
+
+def unix(year, month, day, hour=0):
+    return int(datetime(year, month, day, hour, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.mark.parametrize("column_type", ["string", "timestamp"])
+def test_select_row_groups_uses_updated_at_statistics(tmp_path, column_type):
+    path = tmp_path / "tickets.parquet"
+    table = pa.table({"ticket_id": pa.array(range(1, 7)), "updated_at": UPDATED_AT_COLUMNS[column_type]})
+    pq.write_table(table, path, row_group_size=2)
+    parquet_file = pq.ParquetFile(path)
+
+    assert select_row_groups_updated_since(parquet_file, "updated_at", 0) == [0, 1, 2]
+    # Row group 0 ends at 2025-01-02 12:00; row group 1 ends after 2025-01-04 00:00
+    assert select_row_groups_updated_since(parquet_file, "updated_at", unix(2025, 1, 4)) == [1, 2]
+    # Boundary: a row group whose max equals since_ts was already loaded
+    assert select_row_groups_updated_since(parquet_file, "updated_at", unix(2025, 1, 4, 12)) == [2]
+    assert select_row_groups_updated_since(parquet_file, "updated_at", unix(2030, 1, 1)) == []
+
+
+def test_select_row_groups_keeps_groups_with_nulls(tmp_path):
+    path = tmp_path / "tickets.parquet"
+    updated_at = pa.array([UPDATED_AT[0], None], type=pa.timestamp("ns", tz="UTC"))
+    pq.write_table(pa.table({"ticket_id": [1, 2], "updated_at": updated_at}), path)
+
+    assert select_row_groups_updated_since(pq.ParquetFile(path), "updated_at", unix(2030, 1, 1)) == [0]
+
+
+@pytest.mark.parametrize("column_type", ["string", "timestamp"])
+def test_filter_batch_drops_rows_updated_before_since(column_type):
+    updated_at = pa.concat_arrays([UPDATED_AT_COLUMNS[column_type], pa.nulls(1, UPDATED_AT_COLUMNS[column_type].type)])
+    batch = pa.RecordBatch.from_pydict({"ticket_id": pa.array(range(1, 8)), "updated_at": updated_at})
+
+    filtered = filter_batch_updated_since(batch, "updated_at", unix(2025, 1, 4, 12))
+
+    # Rows updated after since are kept, and so is the null (left to the exact filter)
+    assert filtered.column("ticket_id").to_pylist() == [5, 6, 7]
+    assert filter_batch_updated_since(batch, "updated_at", unix(2030, 1, 1)).column("ticket_id").to_pylist() == [7]
+    assert filter_batch_updated_since(batch, "updated_at", 0) is batch
@@ -1,4 +1,6 @@
 import os
+import json
+import time
 from datetime import datetime, timedelta
 import requests
 from dotenv import load_dotenv
@@ -25,6 +27,105 @@ def save_sync_time(timestamp, ts_file):
     with open(ts_file, 'w') as f:
         f.write(str(timestamp))
 
+def load_last_sync_cursor(cursor_file):
+    """Loads the last saved incremental export cursor from the file, defaults to None."""
+    if os.path.exists(cursor_file):
+        with open(cursor_file, 'r') as f:
+            cursor = f.read().strip()
+            if cursor:
+                return cursor
+            print("Warning: Cursor file is empty. Falling back to the sync timestamp.")
+    return None
+
+def save_sync_cursor(cursor, cursor_file):
+    """Saves the incremental export cursor to the file."""
+    with open(cursor_file, 'w') as f:
+        f.write(str(cursor))
+
+def load_extract_progress(progress_file):
+    """Loads the mid-extraction checkpoint from the file, defaults to None."""
+    if os.path.exists(progress_file):
+        with open(progress_file, 'r') as f:
+            try:
+                return json.load(f)
+            except ValueError:
+                print("Warning: Could not read progress file. Starting a fresh extraction.")
+    return None
+
+def save_extract_progress(progress, progress_file):
+    """Atomically saves the mid-extraction checkpoint to the file."""
+    tmp_file = f"{progress_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp_file, progress_file)
+
+def truncate_partial_extract(partial_file, offset):
+    """
+    Cuts a partial extract back to the byte offset saved in its checkpoint.
+    
+    Anything past the offset (a half-written line or pages fetched after the last
+    checkpoint) is dropped, since the resumed extraction fetches those pages again.
+    Returns False when the offset is missing or past the end of the file, in which
+    case the partial file cannot be trusted and the extraction must start fresh.
+    """
+    if not isinstance(offset, int) or offset < 0 or offset > os.path.getsize(partial_file):
+        return False
+    os.truncate(partial_file, offset)
+    return True
+
+def clear_extract_progress(progress_file):
+    """Removes the mid-extraction checkpoint once an extraction has completed."""
+    if os.path.exists(progress_file):
+        os.remove(progress_file)
+
+def load_etag(etag_file):
+    """
+    Loads the saved ETag, the extract file it belongs to and that response's
+    content hash, defaults to (None, None, None).
+    """
+    if os.path.exists(etag_file):
+        with open(etag_file, 'r') as f:
+            lines = f.read().splitlines()
+        if len(lines) >= 2 and os.path.exists(lines[1]):
+            content_hash = lines[2] if len(lines) >= 3 and lines[2] else None
+            return lines[0] or None, lines[1], content_hash
+    return None, None, None
+
+def save_etag(etag, filename, etag_file, content_hash=None):
+    """Saves the response ETag and content hash together with the extract file it was written to."""
+    with open(etag_file, 'w') as f:
+        f.write(f"{etag or ''}\n{filename}\n{content_hash or ''}")
+
+def pace_from_rate_limit_headers(response, min_remaining=50, default_delay=1):
+    """
+    Sleeps between paginated requests based on Zendesk's rate-limit headers.
+    
+    Only waits when X-Rate-Limit-Remaining drops below min_remaining, spreading the
+    remaining requests over the rest of the one-minute window. Falls back to
+    default_delay when the header is missing or unreadable.
+    
+    Args:
+        response: requests.Response from the previous page
+        min_remaining: Remaining-request threshold below which pacing kicks in
+        default_delay: Seconds to wait when no rate-limit header is present
+        
+    Returns:
+        Number of seconds slept
+    """
+    try:
+        remaining = int(response.headers.get('X-Rate-Limit-Remaining'))
+    except (TypeError, ValueError):
+        time.sleep(default_delay)
+        return default_delay
+    
+    if remaining >= min_remaining:
+        return 0
+    
+    delay = max(1, 60 / max(remaining, 1))
+    print(f"   Rate limit running low ({remaining} requests left). Pausing {delay:.1f}s...")
+    time.sleep(delay)
+    return delay
+
 def calculate_start_of_week():
     """
     Calculates the Unix timestamp for the most recent Monday at 00:00:00 UTC.
@@ -42,10 +143,10 @@ def calculate_start_of_week():
     # Convert to Unix timestamp
     return int(start_of_week.timestamp())
 
-def get_total_ticket_count(auth, url):
-    """Fetches the total approximate ticket count for the account."""
+def get_total_ticket_count(auth, url, session=None, timeout=None):
+    """Fetches the total approximate ticket count for the account, optionally over a shared session."""
     try:
-        response = requests.get(url, auth=auth)
+        response = (session or requests).get(url, auth=auth, timeout=timeout)
         response.raise_for_status()
         data = response.json()
         
@@ -4,13 +4,24 @@ Database Utilities
 Utility functions for PostgreSQL database operations.
 """
 
+import io
+import orjson
 import os
+import queue
+import re
+import threading
+from functools import lru_cache
 import psycopg2
 from psycopg2.extras import execute_values
 from psycopg2 import sql
+import numpy as np
 import pandas as pd
-from typing import Optional, Dict, List, Tuple
-from datetime import datetime
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from typing import Optional, Dict, List, Tuple, Iterable, Iterator
+from datetime import datetime, timezone
+from dateutil import tz as dateutil_tz
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -100,7 +111,30 @@ def get_table_columns(conn, table_name: str) -> set:
     return columns
 
 
-def add_missing_columns(conn, df: pd.DataFrame, table_name: str):
+def get_table_column_types(conn, table_name: str) -> Dict[str, str]:
+    """
+    Get the column names and PostgreSQL data types of an existing table.
+    
+    Args:
+        conn: PostgreSQL connection object
+        table_name: Name of the table
+        
+    Returns:
+        Dict mapping column name to data type (e.g. 'boolean', 'text', 'bigint')
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT column_name, data_type
+        FROM information_schema.columns 
+        WHERE table_schema = 'public' 
+        AND table_name = %s
+    """, (table_name,))
+    column_types = {row[0]: row[1] for row in cursor.fetchall()}
+    cursor.close()
+    return column_types
+
+
+def add_missing_columns(conn, df: pd.DataFrame, table_name: str, commit: bool = True):
     """
     Add missing columns to an existing table based on DataFrame columns.
     
@@ -108,6 +142,8 @@ def add_missing_columns(conn, df: pd.DataFrame, table_name: str):
         conn: PostgreSQL connection object
         df: pandas DataFrame with the desired schema
         table_name: Name of the table to alter
+        commit: If True, commit after each column. If False, the caller owns the
+                transaction and each column is added inside a savepoint instead
     """
     cursor = conn.cursor()
     
@@ -160,12 +196,20 @@ def add_missing_columns(conn, df: pd.DataFrame, table_name: str):
         )
         
         try:
+            if not commit:
+                cursor.execute("SAVEPOINT add_missing_column")
             cursor.execute(alter_sql)
-            conn.commit()  # Commit after each successful addition
+            if commit:
+                conn.commit()  # Commit after each successful addition
+            else:
+                cursor.execute("RELEASE SAVEPOINT add_missing_column")
             print(f"    Added column: {col} ({pg_type})")
         except Exception as e:
-            # Rollback the failed transaction
-            conn.rollback()
+            # Rollback the failed addition (only back to the savepoint in the caller's transaction)
+            if commit:
+                conn.rollback()
+            else:
+                cursor.execute("ROLLBACK TO SAVEPOINT add_missing_column")
             # Check if column already exists (might be a race condition or case-sensitivity issue)
             error_msg = str(e).lower()
             if 'already exists' in error_msg or 'duplicate' in error_msg:
@@ -182,7 +226,9 @@ def create_table_from_df(
     df: pd.DataFrame,
     table_name: str,
     primary_key: Optional[str | List[str] | Tuple[str, ...]] = None,
-    if_exists: str = "replace"
+    if_exists: str = "replace",
+    unlogged: bool = False,
+    commit: bool = True
 ):
     """
     Create a PostgreSQL table from a pandas DataFrame.
@@ -194,6 +240,9 @@ def create_table_from_df(
         primary_key: Optional primary key column name(s). Can be a string for single column,
                      or a list/tuple for composite primary key
         if_exists: What to do if table exists ("replace", "append", "fail")
+        unlogged: If True, create the table UNLOGGED (for an initial bulk load;
+                  switch it back with ensure_table_logged afterwards)
+        commit: If True, commit the DROP/CREATE. If False, leave it to the caller's transaction
     """
     cursor = conn.cursor()
     
@@ -257,7 +306,8 @@ def create_table_from_df(
         cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(
             sql.Identifier(table_name)
         ))
-        conn.commit()
+        if commit:
+            conn.commit()
     
     # Handle primary key (single or composite)
     primary_key_clause = ""
@@ -269,17 +319,38 @@ def create_table_from_df(
             primary_key_clause = f", PRIMARY KEY ({pk_columns})"
     
     create_table_sql = f"""
-        CREATE TABLE IF NOT EXISTS {table_name} (
+        CREATE {'UNLOGGED ' if unlogged else ''}TABLE IF NOT EXISTS {table_name} (
             {', '.join(columns)}
             {primary_key_clause}
         );
     """
     
     cursor.execute(create_table_sql)
-    conn.commit()
+    if commit:
+        conn.commit()
     cursor.close()
 
 
+def ensure_table_logged(cursor, table_name: str):
+    """
+    Switch a table created UNLOGGED for its initial bulk load back to LOGGED.
+    
+    The table is written to WAL once, in bulk, instead of row by row during the
+    load. Does nothing if the table is already logged, so it is safe to call
+    after every load (which also repairs a table left unlogged by a failed
+    first load).
+    
+    Args:
+        cursor: PostgreSQL cursor
+        table_name: Name of the table
+    """
+    cursor.execute("SELECT relpersistence FROM pg_class WHERE oid = to_regclass(%s)", (table_name,))
+    row = cursor.fetchone()
+    if row and row[0] == 'u':
+        cursor.execute(sql.SQL("ALTER TABLE {} SET LOGGED").format(sql.Identifier(table_name)))
+        print(f"  Switched table {table_name} to LOGGED")
+
+
 def load_last_load_timestamp(table_name: str, config_dir: str = "./config") -> int:
     """
     Load the last load timestamp for a table.
@@ -344,6 +415,644 @@ def parse_iso_timestamp(ts_str: str) -> Optional[int]:
         return None
 
 
+# numpy values can still be nested inside lists/dicts read from Parquet
+JSON_DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def json_default(val):
+    """
+    orjson fallback for values it cannot serialize natively (e.g. object-dtype
+    numpy arrays nested in Parquet structs).
+    
+    Args:
+        val: Value orjson could not serialize
+        
+    Returns:
+        JSON-serializable equivalent
+    """
+    if isinstance(val, np.ndarray):
+        return val.tolist()
+    if isinstance(val, np.generic):
+        return val.item()
+    raise TypeError(f"Type is not JSON serializable: {type(val).__name__}")
+
+
+def to_db_value(val):
+    """
+    Convert a single object-dtype cell to a value PostgreSQL can store.
+    
+    - numpy arrays, lists and dicts become JSON strings (empty ones become None)
+    - NaN / None / pandas NA become None
+    
+    Args:
+        val: Cell value
+        
+    Returns:
+        Converted value
+    """
+    # Fast paths for the common missing values (nulls from Arrow come through as None)
+    if val is None:
+        return None
+    if isinstance(val, float):
+        return None if val != val else val
+    # Handle numpy arrays - convert to list/JSON for PostgreSQL
+    # (orjson writes NaN as null)
+    if isinstance(val, np.ndarray):
+        if val.size == 0:
+            return None
+        return orjson.dumps(val.tolist(), option=JSON_DUMPS_OPTIONS, default=json_default).decode()
+    # Handle lists/dicts - convert to JSON string for PostgreSQL
+    if isinstance(val, (list, dict)):
+        return orjson.dumps(val, option=JSON_DUMPS_OPTIONS, default=json_default).decode() if val else None
+    # Handle other scalar missing values (pd.NA, pd.NaT, numpy NaN)
+    try:
+        if pd.isna(val):
+            return None
+    except (ValueError, TypeError):
+        # If pd.isna raises an error (e.g., ambiguous truth value), keep the value
+        pass
+    return val
+
+
+def nested_columns(schema: pa.Schema) -> List[str]:
+    """
+    Get the columns of an Arrow schema holding nested values (lists, structs, maps).
+    
+    These are the only columns whose cells can be arrays/lists/dicts after
+    to_pandas(), i.e. the only ones that need JSON serialization.
+    
+    Args:
+        schema: Arrow schema (e.g. ParquetFile.schema_arrow)
+        
+    Returns:
+        List of column names
+    """
+    return [field.name for field in schema if pa.types.is_nested(field.type)]
+
+
+def dataframe_to_rows(df: pd.DataFrame, json_columns: Optional[List[str]] = None) -> Tuple[List[str], List[tuple]]:
+    """
+    Convert a DataFrame batch into column names and row tuples for loading.
+    
+    Conversion is done column by column instead of row by row: JSON columns go
+    through to_db_value(), datetime columns are formatted as text, and all other
+    columns (strings, numeric, boolean) only have their missing values replaced
+    with None, and only when they contain any. Values come out as plain Python
+    scalars.
+    
+    Args:
+        df: pandas DataFrame batch
+        json_columns: Columns that may hold arrays/lists/dicts (see nested_columns).
+                      Defaults to every object column.
+        
+    Returns:
+        Tuple of (list of column names, list of row tuples)
+    """
+    columns = list(df.columns)
+    column_values = []
+    for col in columns:
+        series = df[col]
+        is_json_column = col in json_columns if json_columns is not None else series.dtype == object
+        if is_json_column:
+            column_values.append([to_db_value(val) for val in series.tolist()])
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            # Format timestamps as text in one vectorized pass rather than per cell at COPY time
+            text_values = series.astype(str).astype(object)
+            if series.hasnans:
+                text_values = text_values.where(series.notna(), None)
+            column_values.append(text_values.tolist())
+        elif not series.hasnans:
+            # No missing values (always the case for numpy int/bool columns) - nothing to replace
+            column_values.append(series.tolist())
+        else:
+            column_values.append(series.astype(object).where(series.notna(), None).tolist())
+    return columns, list(zip(*column_values))
+
+
+def format_copy_value(value) -> str:
+    """
+    Format a Python value as a field for COPY ... WITH (FORMAT csv).
+    
+    NULLs are written as an unquoted empty field and every other value is quoted,
+    so empty strings stay distinct from NULL. Integral floats are written without
+    a decimal part so they load into BIGINT/BOOLEAN columns as well as DOUBLE PRECISION.
+    
+    Args:
+        value: Python value (already converted to None/str/int/float/bool/datetime)
+        
+    Returns:
+        CSV field text
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+# Identity column added to staging tables; numbers rows in the order they were copied
+STAGING_SEQUENCE_COLUMN = "_staging_seq"
+
+
+@lru_cache(maxsize=None)
+def build_merge_statement(
+    table_name: str,
+    staging_table: str,
+    columns: Tuple[str, ...],
+    pk_columns: Tuple[str, ...]
+) -> str:
+    """
+    Build the upsert used by merge_staging_table for a table and column list.
+    
+    Cached, so the statement is only built once per table/column list instead of
+    once per merge.
+    
+    Args:
+        table_name: Name of the target table
+        staging_table: Name of the staging table
+        columns: Column names to copy from the staging table
+        pk_columns: Primary key column names
+        
+    Returns:
+        INSERT ... SELECT DISTINCT ON ... ON CONFLICT DO UPDATE SQL
+    """
+    columns_str = ', '.join(columns)
+    pk_columns_str = ", ".join(pk_columns)
+    pk_set = frozenset(pk_columns)
+    update_columns = [col for col in columns if col not in pk_set]
+    
+    # DISTINCT ON keeps one row per key; the highest staging sequence number is
+    # the most recently copied row
+    return f"""
+        INSERT INTO {table_name} ({columns_str})
+        SELECT DISTINCT ON ({pk_columns_str}) {columns_str} FROM {staging_table}
+        ORDER BY {pk_columns_str}, {STAGING_SEQUENCE_COLUMN} DESC
+        ON CONFLICT ({pk_columns_str}) DO UPDATE SET
+            {', '.join([f"{col} = EXCLUDED.{col}" for col in update_columns])}
+    """
+
+
+def copy_rows_to_table(
+    cursor,
+    table_name: str,
+    columns: List[str],
+    rows: List[tuple],
+    buffer: Optional[io.StringIO] = None
+):
+    """
+    Bulk-load rows into a table using COPY FROM STDIN.
+    
+    NULLs are sent as unquoted empty fields (see format_copy_value).
+    
+    Args:
+        cursor: PostgreSQL cursor
+        table_name: Name of the target (or staging) table
+        columns: Column names, in the same order as the values in each row
+        rows: List of row tuples
+        buffer: Optional StringIO to reuse for the CSV data across calls
+                (defaults to a new buffer)
+    """
+    if buffer is None:
+        buffer = io.StringIO()
+    else:
+        buffer.seek(0)
+        buffer.truncate(0)
+    for row in rows:
+        buffer.write(','.join(format_copy_value(val) for val in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    
+    cursor.copy_expert(f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def create_staging_table(cursor, table_name: str) -> str:
+    """
+    Create an empty temporary staging table shaped like the target table.
+    
+    The staging table lives for the session (not just the transaction), so rows
+    can be collected across several batches and commits before they are merged.
+    Any staging table left behind by an earlier failed load is replaced.
+    
+    An extra identity column (STAGING_SEQUENCE_COLUMN) numbers the rows in the
+    order they are copied, so the merge can tell which duplicate came last.
+    
+    Args:
+        cursor: PostgreSQL cursor
+        table_name: Name of the target table
+        
+    Returns:
+        Name of the staging table
+    """
+    staging_table = f"_staging_{table_name}"
+    cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+    cursor.execute(f"CREATE TEMP TABLE {staging_table} (LIKE {table_name} INCLUDING DEFAULTS)")
+    cursor.execute(
+        f"ALTER TABLE {staging_table} ADD COLUMN {STAGING_SEQUENCE_COLUMN} BIGINT GENERATED ALWAYS AS IDENTITY"
+    )
+    return staging_table
+
+
+def merge_staging_table(
+    cursor,
+    table_name: str,
+    staging_table: str,
+    columns: List[str],
+    primary_key: str | List[str] | Tuple[str, ...]
+):
+    """
+    Upsert the rows collected in a staging table into the target table, then empty it.
+    
+    Conflict resolution runs once for everything staged since the last merge
+    instead of once per batch. Rows repeating a primary key are deduplicated
+    first (the most recently copied row wins), so duplicates within a load do
+    not make the upsert fail.
+    
+    Args:
+        cursor: PostgreSQL cursor
+        table_name: Name of the target table
+        staging_table: Name of the staging table (from create_staging_table)
+        columns: Column names present in the staged rows
+        primary_key: Primary key column name(s). Can be a string for single column,
+                     or a list/tuple for composite primary key
+    """
+    # Handle composite primary key
+    if isinstance(primary_key, str):
+        pk_columns = (primary_key,)
+    else:
+        pk_columns = tuple(primary_key)
+    
+    cursor.execute(build_merge_statement(table_name, staging_table, tuple(columns), pk_columns))
+    cursor.execute(f"TRUNCATE {staging_table}")
+
+
+# Explicit UTC offset after the time component ('Z', '+00:00', '-0500', '+02'),
+# so the day in a date-only value like '2025-09-05' is not mistaken for an offset
+ISO_OFFSET_SUFFIX_PATTERN = r'[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}(?::?\d{2})?)$'
+
+
+def localize_to_local_time(values: pd.Series) -> pd.Series:
+    """
+    Attach the system time zone to naive datetimes, as datetime.timestamp() assumes.
+    
+    Uses dateutil's tzlocal() so every value gets the UTC offset in effect on its
+    own date (DST-aware), not today's offset.
+    
+    Args:
+        values: pandas Series of naive datetimes
+        
+    Returns:
+        pandas Series of UTC datetimes
+    """
+    return values.dt.tz_localize(dateutil_tz.tzlocal()).dt.tz_convert('UTC')
+
+
+def parse_iso_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Vectorized parse_iso_timestamp: parse a whole column of ISO timestamps at once.
+    
+    Uses pandas' C ISO8601 parser instead of calling datetime.fromisoformat per row.
+    Naive values (strings without a UTC offset and naive datetimes alike) are
+    treated as local time, as parse_iso_timestamp does via datetime.timestamp().
+    
+    Args:
+        values: pandas Series of ISO timestamp strings (or datetimes)
+        
+    Returns:
+        pandas Series of Unix timestamps (nullable Int64), <NA> where parsing fails
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = localize_to_local_time(values) if values.dt.tz is None else values.dt.tz_convert('UTC')
+    else:
+        parsed = pd.to_datetime(values, utc=True, errors='coerce', format='ISO8601')
+        # Zendesk timestamps always carry 'Z'; re-parse only the naive strings as local time
+        text = values.astype('string')
+        naive = text.notna() & ~text.str.contains(ISO_OFFSET_SUFFIX_PATTERN, regex=True).fillna(False)
+        if naive.any():
+            parsed[naive] = localize_to_local_time(pd.to_datetime(values[naive], errors='coerce', format='ISO8601'))
+    # Whole seconds since the epoch (independent of the datetime unit); NaT -> <NA>
+    seconds = (parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    return seconds.astype('Int64')
+
+
+# Zendesk timestamps ('2025-09-05T09:40:36Z') sort chronologically as plain strings
+ZENDESK_TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$')
+
+
+def statistic_as_utc_datetime(stats, value) -> Optional[datetime]:
+    """
+    Convert a timestamp min/max from Parquet column statistics to a UTC datetime.
+    
+    Naive values from UTC-adjusted timestamp columns are UTC; other naive values
+    are local time, as parse_iso_timestamps treats naive datetimes.
+    
+    Args:
+        stats: pyarrow.parquet.Statistics the value came from
+        value: stats.min or stats.max
+        
+    Returns:
+        Timezone-aware UTC datetime, or None when the value is not a timestamp
+    """
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc)
+    logical_type = orjson.loads(stats.logical_type.to_json()) if stats.logical_type is not None else {}
+    if logical_type.get('isAdjustedToUTC'):
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def select_row_groups_updated_since(parquet_file, updated_at_column: str, since_ts: int) -> List[int]:
+    """
+    Pick the Parquet row groups that may contain rows updated after since_ts.
+    
+    Uses the per-row-group min/max statistics of updated_at_column to skip row groups
+    whose rows were all updated at or before since_ts, without decoding them. Works
+    for timestamp columns (e.g. tickets) and for string columns in Zendesk's
+    fixed-width UTC format (e.g. users). A row group is kept whenever its statistics
+    cannot prove that (no statistics, nulls, or strings in any other format).
+    
+    Args:
+        parquet_file: pyarrow.parquet.ParquetFile to inspect
+        updated_at_column: Name of the updated_at column
+        since_ts: Unix timestamp of the last load (0 keeps every row group)
+        
+    Returns:
+        List of row group indices to read
+    """
+    metadata = parquet_file.metadata
+    if metadata is None:
+        # In-memory table (ArrowTableReader): a single row group without statistics
+        return [0]
+    all_row_groups = list(range(metadata.num_row_groups))
+    if since_ts <= 0:
+        return all_row_groups
+    
+    since_dt = datetime.fromtimestamp(since_ts, tz=timezone.utc)
+    since_iso = since_dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    
+    row_groups = []
+    for i in all_row_groups:
+        row_group = metadata.row_group(i)
+        stats = None
+        for j in range(row_group.num_columns):
+            column = row_group.column(j)
+            if column.path_in_schema == updated_at_column:
+                stats = column.statistics
+                break
+        
+        can_skip = False
+        if stats is not None and stats.has_min_max and stats.null_count == 0:
+            if isinstance(stats.max, str):
+                can_skip = (
+                    isinstance(stats.min, str)
+                    and ZENDESK_TIMESTAMP_PATTERN.match(stats.min) is not None
+                    and ZENDESK_TIMESTAMP_PATTERN.match(stats.max) is not None
+                    and stats.max <= since_iso
+                )
+            else:
+                max_dt = statistic_as_utc_datetime(stats, stats.max)
+                can_skip = max_dt is not None and max_dt <= since_dt
+        if not can_skip:
+            row_groups.append(i)
+    
+    skipped = len(all_row_groups) - len(row_groups)
+    if skipped:
+        print(f"  Skipped {skipped} of {len(all_row_groups)} Parquet row group(s) already loaded")
+    return row_groups
+
+
+def filter_batch_updated_since(record_batch: pa.RecordBatch, updated_at_column: str, since_ts: int) -> pa.RecordBatch:
+    """
+    Drop rows updated at or before since_ts from an Arrow record batch.
+    
+    Runs before the batch is converted to pandas, so rows that were already loaded
+    are never converted. Timestamp columns (e.g. tickets) are compared as
+    timestamps; string columns are compared only where the value is in Zendesk's
+    fixed-width UTC format. Nulls and any other values are kept for the exact
+    timestamp filter that runs afterwards.
+    
+    Args:
+        record_batch: Arrow record batch
+        updated_at_column: Name of the updated_at column
+        since_ts: Unix timestamp of the last load (0 keeps every row)
+        
+    Returns:
+        Filtered record batch (the input batch when nothing can be filtered)
+    """
+    if since_ts <= 0 or updated_at_column not in record_batch.schema.names:
+        return record_batch
+    updated_at = record_batch.column(updated_at_column)
+    if pa.types.is_timestamp(updated_at.type):
+        if updated_at.type.tz is not None:
+            since = pa.scalar(since_ts, pa.timestamp('s', tz='UTC'))
+        else:
+            # Naive timestamps are local time, as in parse_iso_timestamps
+            since = pa.scalar(datetime.fromtimestamp(since_ts), pa.timestamp('s'))
+        keep = pc.greater(updated_at, since.cast(updated_at.type))
+        return record_batch.filter(pc.fill_null(keep, True))
+    if not (pa.types.is_string(updated_at.type) or pa.types.is_large_string(updated_at.type)):
+        return record_batch
+    
+    since_iso = datetime.fromtimestamp(since_ts, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    keep = pc.or_kleene(
+        pc.greater(updated_at, since_iso),
+        pc.invert(pc.match_substring_regex(updated_at, ZENDESK_TIMESTAMP_PATTERN.pattern))
+    )
+    return record_batch.filter(pc.fill_null(keep, True))
+
+
+class ArrowTableReader:
+    """
+    Stand-in for pyarrow.parquet.ParquetFile over an in-memory Arrow table.
+    
+    Provides what the Parquet loaders use (schema_arrow and iter_batches), so data
+    that is already in memory can be loaded without writing and re-reading a
+    Parquet file. The table is treated as a single row group without statistics.
+    """
+    
+    metadata = None
+    
+    def __init__(self, table: pa.Table):
+        self.table = table
+        self.schema_arrow = table.schema
+    
+    def iter_batches(self, batch_size: int = 65536, row_groups: Optional[List[int]] = None, columns: Optional[List[str]] = None):
+        """
+        Iterate over the table in record batches.
+        
+        Args:
+            batch_size: Maximum number of rows per batch
+            row_groups: Ignored (the table is a single row group)
+            columns: Optional subset of columns to read
+            
+        Returns:
+            Iterator of pyarrow RecordBatches
+        """
+        table = self.table.select(columns) if columns is not None else self.table
+        return iter(table.to_batches(max_chunksize=batch_size))
+
+
+def open_parquet_source(source):
+    """
+    Open a Parquet loader source for reading.
+    
+    Args:
+        source: Path to a Parquet file, or an ArrowTableReader
+        
+    Returns:
+        pyarrow.parquet.ParquetFile, or the ArrowTableReader itself
+    """
+    if isinstance(source, ArrowTableReader):
+        return source
+    return pq.ParquetFile(source)
+
+
+def cast_boolean_columns(record_batch: pa.RecordBatch, columns: List[str]) -> pa.RecordBatch:
+    """
+    Convert numeric 0/1 columns of an Arrow record batch to booleans.
+    
+    Each column is converted with a single Arrow compute kernel (value != 0) that
+    keeps nulls as nulls; NaN is treated as null, matching
+    pd.to_numeric(...).astype('boolean').
+    
+    Args:
+        record_batch: Arrow record batch
+        columns: Names of numeric or boolean columns to convert
+        
+    Returns:
+        Record batch with the given columns as Arrow booleans
+    """
+    names = record_batch.schema.names
+    arrays = list(record_batch.columns)
+    for col in columns:
+        idx = names.index(col)
+        arr = arrays[idx]
+        if pa.types.is_boolean(arr.type):
+            continue
+        if pa.types.is_floating(arr.type):
+            arr = pc.if_else(pc.is_nan(arr), pa.scalar(None, arr.type), arr)
+        arrays[idx] = pc.not_equal(arr, pa.scalar(0, arr.type))
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def read_parquet_sample(
+    parquet_file,
+    row_groups: List[int],
+    sample_size: int = 1000,
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Read the first rows of the selected Parquet row groups for schema inference.
+    
+    Args:
+        parquet_file: pyarrow.parquet.ParquetFile to read from
+        row_groups: Row group indices to sample from
+        sample_size: Maximum number of rows to read
+        columns: Optional subset of columns to read (defaults to all columns)
+        
+    Returns:
+        pandas DataFrame with up to sample_size rows (empty, with the file's
+        columns, when no rows are selected)
+    """
+    if row_groups:
+        for record_batch in parquet_file.iter_batches(batch_size=sample_size, row_groups=row_groups, columns=columns):
+            return record_batch.to_pandas()
+    empty_table = parquet_file.schema_arrow.empty_table()
+    if columns is not None:
+        empty_table = empty_table.select(columns)
+    return empty_table.to_pandas()
+
+
+def infer_schema_for_existing_table(
+    conn,
+    parquet_file,
+    row_groups: List[int],
+    table_name: str,
+    sample_size: int = 1000
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Work out the load schema for a Parquet file going into an existing table.
+    
+    Boolean columns already in the table are taken from its PostgreSQL types;
+    only columns the table does not have yet are sampled and run through
+    infer_schema.
+    
+    Args:
+        conn: PostgreSQL connection object
+        parquet_file: pyarrow.parquet.ParquetFile being loaded
+        row_groups: Row group indices that will be loaded
+        table_name: Name of the existing table
+        sample_size: Number of rows to sample for the new columns
+        
+    Returns:
+        Tuple of (processed sample DataFrame of the new columns, list of boolean column names)
+    """
+    column_types = {col.lower(): data_type for col, data_type in get_table_column_types(conn, table_name).items()}
+    file_columns = parquet_file.schema_arrow.names
+    new_columns = [col for col in file_columns if col.lower() not in column_types]
+    
+    boolean_columns = [col for col in file_columns if column_types.get(col.lower()) == 'boolean']
+    if not new_columns:
+        return pd.DataFrame(), boolean_columns
+    
+    df_head = read_parquet_sample(parquet_file, row_groups, sample_size=sample_size, columns=new_columns)
+    df_sample, new_boolean_columns = infer_schema(df_head, sample_size=sample_size)
+    return df_sample, boolean_columns + new_boolean_columns
+
+
+def prefetch_batches(batches: Iterable, max_prefetch: int = 2) -> Iterator:
+    """
+    Produce batches on a background thread so the consumer can overlap its own work.
+    
+    Batches are handed over through a bounded queue, so at most max_prefetch
+    batches are held in memory ahead of the consumer. Exceptions raised while
+    producing are re-raised in the consumer. Close the returned generator (e.g.
+    with contextlib.closing) so the producer stops if the consumer fails.
+    
+    Args:
+        batches: Iterable producing the batches (consumed on the background thread)
+        max_prefetch: Maximum number of batches produced ahead of the consumer
+        
+    Yields:
+        Batches in the order they were produced
+    """
+    batch_queue = queue.Queue(maxsize=max_prefetch)
+    stop = threading.Event()
+    done = object()
+    
+    def producer():
+        try:
+            for batch in batches:
+                if stop.is_set():
+                    return
+                batch_queue.put((batch, None))
+        except Exception as e:
+            batch_queue.put((None, e))
+            return
+        batch_queue.put((done, None))
+    
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    try:
+        while True:
+            batch, error = batch_queue.get()
+            if error is not None:
+                raise error
+            if batch is done:
+                return
+            yield batch
+    finally:
+        stop.set()
+        # Drain the queue so a producer blocked on put() can see the stop flag
+        while thread.is_alive():
+            try:
+                batch_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
+
+
 def infer_schema(
     df: pd.DataFrame,
     text_columns: Optional[List[str]] = None,
@@ -1,9 +1,13 @@
-import glob
+import fnmatch
+import orjson
 import os
 import re
 import pandas as pd
 from datetime import datetime
 
+# Unix timestamp right before the file extension, e.g. tickets_until_1700000000.jsonl
+FILENAME_TIMESTAMP_PATTERN = re.compile(r'(\d+)\.(json|jsonl|csv|txt|parquet)$', re.IGNORECASE)
+
 
 def load_latest_file_from_dir(INPUT_DIR, file_pattern="*.json"):
     """
@@ -17,33 +21,47 @@ def load_latest_file_from_dir(INPUT_DIR, file_pattern="*.json"):
     Returns:
         Path to the latest file, or None if no matching files found
     """
-    search_pattern = f"{INPUT_DIR}/{file_pattern}"
-    matching_files = glob.glob(search_pattern)
-    timestamped_files = []
-
-    for filepath in matching_files:
-        fname = os.path.basename(filepath)
-        # Extract timestamp from filename - look for numbers before file extension
-        # Handles formats like: ticket_fields_{timestamp}.json, tickets_{timestamp}.parquet
-        # Match any file extension (json, csv, etc.)
-        match = re.search(r'(\d+)\.(json|csv|txt|parquet)$', fname, re.IGNORECASE)
-        if match:
-            try:
-                timestamp = int(match.group(1))
-                timestamped_files.append((timestamp, filepath))
-            except ValueError:
-                continue
+    # Single pass over the directory entries, keeping only the newest match
+    latest_timestamp, latest_file = -1, None
+    if os.path.isdir(INPUT_DIR):
+        with os.scandir(INPUT_DIR) as entries:
+            for entry in entries:
+                fname = entry.name
+                # Like glob, wildcards do not match hidden files
+                if fname.startswith('.') or not fnmatch.fnmatchcase(fname, file_pattern):
+                    continue
+                # Extract timestamp from filename - look for numbers before file extension
+                # Handles formats like: ticket_fields_{timestamp}.json, tickets_{timestamp}.parquet
+                match = FILENAME_TIMESTAMP_PATTERN.search(fname)
+                if match:
+                    timestamp = int(match.group(1))
+                    if timestamp > latest_timestamp:
+                        latest_timestamp, latest_file = timestamp, f"{INPUT_DIR}/{fname}"
 
-    if not timestamped_files:
+    if latest_file is None:
         print(f"🚨 Error: No files matching pattern '{file_pattern}' with unix timestamp found in '{INPUT_DIR}'. Please run the extraction first.")
         return None
     else:
-        # Select file with largest timestamp
-        latest_timestamp, latest_file = max(timestamped_files, key=lambda t_file: t_file[0])
         print(f"✅ Latest file by unix timestamp: {latest_file}")
         return latest_file
 
 
+def load_records_from_file(filepath):
+    """
+    Loads extracted records from a JSON array file or a JSON Lines (.jsonl) file.
+    
+    Args:
+        filepath: Path to the extracted file
+        
+    Returns:
+        List of record dictionaries
+    """
+    with open(filepath, 'rb') as f:
+        if filepath.endswith('.jsonl'):
+            return [orjson.loads(line) for line in f if line.strip()]
+        return orjson.loads(f.read())
+
+
 def deduplicate_dataframe(df, primary_key_column, updated_at_column=None, entity_name="records"):
     """
     Deduplicates a DataFrame by primary key, keeping the most recent version if updated_at is provided.
@@ -67,6 +85,11 @@ def deduplicate_dataframe(df, primary_key_column, updated_at_column=None, entity
     
     initial_count = len(df)
     
+    # Delta extracts rarely repeat a key; skip the sort when every key is unique
+    if df[primary_key_column].is_unique:
+        print(f"✅ No duplicates found - all {initial_count} {entity_name} are unique")
+        return df, 0
+    
     # If updated_at column is provided, use it to keep the most recent version
     if updated_at_column and updated_at_column in df.columns:
         # Parse updated_at to datetime for proper sorting
@@ -96,6 +119,7 @@ def extract_timestamp_from_filename(filepath):
     Handles formats like:
     - organizations_{timestamp}.json
     - organizations_until_{timestamp}.json
+    - organizations_until_{timestamp}.jsonl
     - tickets_{timestamp}.json
     
     Args:
@@ -106,7 +130,7 @@ def extract_timestamp_from_filename(filepath):
     """
     fname = os.path.basename(filepath)
     # Extract timestamp from filename - look for numbers before file extension
-    match = re.search(r'(\d+)\.(json|csv|txt|parquet)$', fname, re.IGNORECASE)
+    match = FILENAME_TIMESTAMP_PATTERN.search(fname)
     if match:
         try:
             return int(match.group(1))
@@ -115,7 +139,7 @@ def extract_timestamp_from_filename(filepath):
     return None
 
 
-def export_to_parquet(df, output_dir, entity_name, timestamp=None):
+def export_to_parquet(df, output_dir, entity_name, timestamp=None, row_group_size=50000, compression="zstd"):
     """
     Exports a pandas DataFrame to Parquet format with timestamped filename.
     
@@ -124,6 +148,10 @@ def export_to_parquet(df, output_dir, entity_name, timestamp=None):
         output_dir: Directory where the parquet file will be saved
         entity_name: Name of the entity (e.g., "tickets", "users", "organizations")
         timestamp: Optional unix timestamp. If None, current timestamp will be used.
+        row_group_size: Rows per Parquet row group. Smaller row groups let incremental
+                        loads skip already-loaded data using row group statistics.
+        compression: Parquet compression codec (default: "zstd", smaller than snappy
+                     and still fast to decode on load)
         
     Returns:
         Path to the exported parquet file
@@ -138,7 +166,7 @@ def export_to_parquet(df, output_dir, entity_name, timestamp=None):
     output_filename = f"{output_dir}/{entity_name}_{timestamp}.parquet"
     
     # Export to parquet
-    df.to_parquet(output_filename, index=False)
+    df.to_parquet(output_filename, index=False, row_group_size=row_group_size, compression=compression)
     
     print(f"\n✅ Success! {entity_name.capitalize()} table saved to: {output_filename}")
     